@@ -0,0 +1,116 @@
+import pygame
+from collections import OrderedDict
+
+
+class AssetManager:
+    """Wspólna dla całego procesu pamięć podręczna obrazów gry.
+
+    Każdy plik jest dekodowany z dysku tylko raz, a przeskalowane warianty
+    i obrócone warianty są zapamiętywane pod kluczem (ścieżka, rozmiar,
+    tryb konwersji, kąt obrotu).
+    Po przekroczeniu limitu pamięci usuwane są najdawniej używane obrazy,
+    razem z ich maskami - pamięć masek wlicza się do tego samego limitu.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes  # Limit pamięci zajmowanej przez obrazy
+        self._images = OrderedDict()  # Klucz -> powierzchnia (kolejność LRU)
+        self._sizes = {}  # Klucz -> liczba bajtów powierzchni
+        self._masks = {}  # Klucz obrazu -> (maska pikseli do kolizji, liczba bajtów)
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_loads = 0
+        self.evictions = 0
+
+    def get_image(self, path, size=None, mode="alpha", angle=0):
+        """Zwraca obraz z pamięci podręcznej, w razie potrzeby wczytując go, skalując i obracając.
+
+        mode: "alpha" (convert_alpha), "opaque" (convert) lub None (bez konwersji).
+        angle: kąt obrotu w stopniach (przeciwnie do ruchu wskazówek zegara).
+        """
+        key = (path, tuple(size) if size else None, mode, angle)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        if angle:
+            # Obrót przeskalowanego obrazu z pamięci - powierzchnia rośnie, by zmieścić rogi
+            image = pygame.transform.rotate(self.get_image(path, size, mode), angle)
+        elif size is None:
+            image = self._load(path, mode)
+        else:
+            # Skalowanie z zapamiętanego oryginału - bez ponownego odczytu z dysku
+            image = pygame.transform.scale(self.get_image(path, None, mode), tuple(size))
+        self._store(key, image)
+        return image
+
+    def get_mask(self, path, size=None, mode="alpha", angle=0):
+        """Zwraca maskę pikseli obrazu, liczoną tylko raz dla danego pliku, rozmiaru i kąta."""
+        key = (path, tuple(size) if size else None, mode, angle)
+        entry = self._masks.get(key)
+        if entry is not None:
+            if key in self._images:
+                self._images.move_to_end(key)  # Używana maska utrzymuje swój obraz w pamięci
+            return entry[0]
+
+        image = self.get_image(path, size, mode, angle)
+        mask = pygame.mask.from_surface(image)
+        nbytes = (int(image.get_width()) + 7) // 8 * int(image.get_height())  # Jeden bit na piksel
+        self._masks[key] = (mask, nbytes)
+        self.bytes_used += nbytes
+        self._evict()
+        return mask
+
+    def _load(self, path, mode):
+        """Dekoduje obraz z dysku i konwertuje go do formatu ekranu."""
+        image = pygame.image.load(path)
+        self.disk_loads += 1
+        if mode == "alpha":
+            return image.convert_alpha()
+        if mode == "opaque":
+            return image.convert()
+        return image
+
+    def _store(self, key, image):
+        """Dodaje obraz do pamięci podręcznej i usuwa najstarsze przy przekroczeniu limitu."""
+        size = int(image.get_pitch()) * int(image.get_height())
+        self._images[key] = image
+        self._sizes[key] = size
+        self.bytes_used += size
+        self._evict()
+
+    def _evict(self):
+        """Usuwa najdawniej używane obrazy (z ich maskami), dopóki pamięć przekracza limit."""
+        # Zawsze zostawiamy co najmniej ostatnio użyty obraz
+        while self.bytes_used > self.max_bytes and len(self._images) > 1:
+            old_key, _ = self._images.popitem(last=False)
+            self.bytes_used -= self._sizes.pop(old_key)
+            if old_key in self._masks:
+                self.bytes_used -= self._masks.pop(old_key)[1]
+            self.evictions += 1
+
+    def clear(self):
+        """Czyści pamięć podręczną (np. po zmianie trybu wyświetlania)."""
+        self._images.clear()
+        self._sizes.clear()
+        self._masks.clear()
+        self.bytes_used = 0
+
+    def stats(self):
+        """Zwraca liczniki trafień, chybień i zajętej pamięci."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_loads": self.disk_loads,
+            "evictions": self.evictions,
+            "entries": len(self._images),
+            "bytes": self.bytes_used,
+        }
+
+
+# Jedna instancja współdzielona przez wszystkie obiekty gry
+assets = AssetManager()
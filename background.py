@@ -0,0 +1,89 @@
+import pygame
+
+
+class ParallaxBackground:
+    """Tło przewijane warstwami (paralaksa) z poziomych pasów grafiki tła.
+
+    Każda warstwa jest raz zamieniana na pas podwójnej szerokości: pas grafiki
+    i jego lustrzane odbicie, więc powtarza się bez widocznego szwu. W klatce
+    warstwa to najwyżej dwa blity - bez skalowania i tworzenia wycinków.
+    """
+
+    def __init__(self, image, layers):
+        """layers - lista (góra, dół, prędkość): granice pasa w pikselach i przesunięcie na krok.
+
+        Warstwy powinny razem pokrywać całą wysokość ekranu.
+        """
+        self.width = image.get_width()
+        self.layers = []  # (pas podwójnej szerokości, y, prędkość)
+        for top, bottom, speed in layers:
+            band = image.subsurface((0, top, self.width, bottom - top))
+            strip = pygame.Surface((2 * self.width, bottom - top), 0, image)
+            strip.blit(band, (0, 0))
+            strip.blit(pygame.transform.flip(band, True, False), (self.width, 0))
+            self.layers.append((strip, top, speed))
+        self.offsets = [0.0] * len(self.layers)  # Przewinięcie warstw
+        self.drawn_shifts = [None] * len(self.layers)  # Przesunięcia warstw widoczne na ekranie
+
+    @classmethod
+    def from_config(cls, image, config):
+        """Tworzy tło z klucza parallax_layers (ułamki wysokości ekranu i prędkości rur)."""
+        height = image.get_height()
+        layers = [(int(top * height), int(bottom * height), speed * config['pipe_speed'])
+                  for top, bottom, speed in config['parallax_layers']]
+        return cls(image, layers)
+
+    def update(self):
+        """Przesuwa warstwy o jeden krok fizyki."""
+        period = 2 * self.width
+        for i, (_, _, speed) in enumerate(self.layers):
+            self.offsets[i] = (self.offsets[i] + speed) % period
+
+    def reset(self):
+        """Ustawia warstwy w położeniu początkowym."""
+        self.offsets = [0.0] * len(self.layers)
+
+    def draw(self, screen, alpha=1.0):
+        """Rysuje warstwy; alpha - położenie między poprzednim a bieżącym krokiem (0..1)."""
+        for i in range(len(self.layers)):
+            self.drawn_shifts[i] = self._shift(i, alpha)
+            self._draw_layer(screen, i, self.drawn_shifts[i])
+
+    def draw_changed(self, screen, alpha, restore):
+        """Rysowanie dla trybu odświeżania fragmentów ekranu.
+
+        Warstwa, która przesunęła się od ostatniego rysowania, jest rysowana w całości.
+        W pozostałych tło jest przywracane tylko pod prostokątami restore
+        (miejsca ruchomych elementów z poprzedniej klatki).
+        Zwraca listę pasów ekranu narysowanych w całości.
+        """
+        changed = []
+        for i, (strip, y, _) in enumerate(self.layers):
+            band = pygame.Rect(0, y, self.width, strip.get_height())
+            shift = self._shift(i, alpha)
+            if shift != self.drawn_shifts[i]:
+                self.drawn_shifts[i] = shift
+                self._draw_layer(screen, i, shift)
+                changed.append(band)
+                continue
+            clip = screen.get_clip()
+            for rect in restore:
+                area = rect.clip(band)
+                if area.width and area.height:
+                    screen.set_clip(area)
+                    self._draw_layer(screen, i, shift)
+            screen.set_clip(clip)
+        return changed
+
+    def _shift(self, i, alpha):
+        """Przesunięcie warstwy i w pikselach ekranu dla położenia alpha między krokami."""
+        speed = self.layers[i][2]
+        return round(self.offsets[i] - speed * (1 - alpha)) % (2 * self.width)
+
+    def _draw_layer(self, screen, i, shift):
+        """Rysuje warstwę i przewiniętą o shift pikseli (najwyżej dwa blity)."""
+        strip, y, _ = self.layers[i]
+        screen.blit(strip, (-shift, y))
+        if shift > self.width:
+            # Początek pasa dochodzi z prawej strony, gdy jego koniec jest już na ekranie
+            screen.blit(strip, (2 * self.width - shift, y))
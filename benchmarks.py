@@ -0,0 +1,185 @@
+import os
+import time
+from unittest.mock import patch
+
+# Pomiary działają bez okna i dźwięku
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+from assets import assets  # noqa: E402
+from background import ParallaxBackground  # noqa: E402
+from bird import Bird  # noqa: E402
+from game import FlappyBirdGame  # noqa: E402
+from pipes import Pipes  # noqa: E402
+from utils import load_config  # noqa: E402
+
+
+def init_display(config):
+    """Tworzy (niewidoczne) okno o rozmiarze z konfiguracji - potrzebne do konwersji grafik.
+
+    Wywoływane na początku każdego pomiaru: FlappyBirdGame.shutdown() zamyka pygame.
+    Grafiki w pamięci podręcznej są przekonwertowane dla poprzedniego okna, więc ją czyścimy.
+    """
+    pygame.init()
+    assets.clear()
+    return pygame.display.set_mode((config['width'], config['height']))
+
+
+def benchmark_collisions(config, frames=20000, seed=0):
+    """Porównuje czas sprawdzania kolizji w trybie "rect" i "mask" na tej samej trasie.
+
+    Ptak leci na wysokości odstępu najbliższej pary rur (z lekkim odchyleniem),
+    więc co klatkę sprawdzana jest para nachodząca na niego w osi X.
+    Zwraca słownik: tryb -> (mikrosekundy na sprawdzenie, liczba kolizji).
+    """
+    init_display(config)
+    results = {}
+    for mode in ("rect", "mask"):
+        bird = Bird(100, config['height'] // 2, 30, config['gravity'], config['jump_force'])
+        pipes = Pipes(config['pipe_width'], config['pipe_gap'], config['pipe_speed'],
+                      spacing=config['pipe_spacing'], seed=seed, collision_mode=mode)
+        pipes.prepare_renderer(config['height'])
+        hits = 0
+        elapsed = 0.0
+        for frame in range(frames):
+            pipes.update()
+            for pair in pipes.pairs():
+                if pair.x + pipes.width > bird.rect.left:
+                    # Ptak ociera się o krawędź odstępu - przypadek, w którym maski mają znaczenie
+                    bird.rect.y = pair.gap_pos - bird.rect.height + frame % 7 - 3
+                    break
+            start = time.perf_counter()
+            hits += pipes.check_collision(bird.rect, bird.mask, bird.mask_rect)
+            elapsed += time.perf_counter() - start
+        results[mode] = (elapsed / frames * 1e6, hits)
+    return results
+
+
+def benchmark_bird_tilt(config, frames=5000):
+    """Porównuje rysowanie nachylonego ptaka: obrót w każdej klatce i tablica obróconych grafik.
+
+    Zwraca słownik: sposób -> mikrosekundy na klatkę.
+    """
+    screen = init_display(config)
+    bird = Bird(100, config['height'] // 2, 30, config['gravity'], config['jump_force'])
+    speeds = [(frame % 60) / 3 - config['jump_force'] for frame in range(frames)]  # Od skoku do nurkowania
+
+    start = time.perf_counter()
+    for movement in speeds:
+        image = pygame.transform.rotate(bird.image, bird.sprites.angle(movement))
+        screen.blit(image, image.get_rect(center=bird.rect.center))
+    rotate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for movement in speeds:
+        bird.angle = bird.sprites.angle(movement)
+        bird.draw(screen)
+    table = time.perf_counter() - start
+    return {"rotate": rotate / frames * 1e6, "tablica": table / frames * 1e6}
+
+
+def benchmark_parallax(config, frames=2000, budget_ms=1.0):
+    """Mierzy czas rysowania tła: stała grafika i przewijane warstwy (paralaksa).
+
+    Zwraca słownik: sposób -> (milisekundy na klatkę, czy w budżecie budget_ms).
+    """
+    screen = init_display(config)
+    image = assets.get_image("tlo.png", (config['width'], config['height']), mode="opaque")
+    parallax = ParallaxBackground.from_config(image, config)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        screen.blit(image, (0, 0))
+    static = (time.perf_counter() - start) / frames * 1000
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        parallax.update()
+        parallax.draw(screen, 0.5)
+    layered = (time.perf_counter() - start) / frames * 1000
+    return {"stałe": (static, static <= budget_ms), "warstwy": (layered, layered <= budget_ms)}
+
+
+def create_game(config):
+    """Tworzy grę z podaną konfiguracją, bez ekranu wpisywania nazwy."""
+    with patch.object(FlappyBirdGame, 'show_name_input',
+                      lambda game: setattr(game, 'player_name', 'BENCHMARK')), \
+            patch('game.load_config', return_value=config):
+        return FlappyBirdGame()
+
+
+def autopilot(game):
+    """Prosta strategia: skok, gdy ptak opada poniżej odstępu najbliższej pary rur."""
+    bird = game.bird
+    pair = next((p for p in game.pipes.pairs() if p.x + game.pipes.width > bird.rect.left), None)
+    gap_bottom = pair.gap_pos if pair else game.config['height'] // 2 + 75
+    if bird.rect.bottom > gap_bottom - 10 and bird.movement > 0:
+        bird.jump()
+
+
+def benchmark_gameplay_render(config, frames=1000, seed=0):
+    """Porównuje czas klatki rozgrywki przy pełnym rysowaniu i odświeżaniu fragmentów.
+
+    Każdy tryb jest mierzony na stałym tle i na warstwach parallax_layers z konfiguracji.
+    Zwraca słownik: (render_mode, tło) -> średni czas render() w milisekundach.
+    """
+    results = {}
+    variants = [(mode, layers) for layers in ([], config['parallax_layers']) for mode in ("full", "dirty")]
+    for mode, layers in variants:
+        game = create_game({**config, 'render_mode': mode, 'parallax_layers': layers})
+        game.bird.jump_sound = None
+        game.game_over = lambda: setattr(game, 'game_active', False)  # Bez zapisu wyników
+        elapsed = 0.0
+        for frame in range(frames):
+            if not game.game_active:
+                game.start_game()
+                game.pipes.reset(seed)
+            autopilot(game)
+            game.update()
+            start = time.perf_counter()
+            game.render()
+            elapsed += time.perf_counter() - start
+        results[mode, "warstwy" if layers else "stałe"] = elapsed / frames * 1000
+        game.shutdown()
+    return results
+
+
+def benchmark_idle_menu(config, seconds=5.0):
+    """Mierzy czas procesora zużywany przez grę stojącą w menu głównym.
+
+    Porównuje rysowanie każdej klatki (idle_rendering wyłączone) z rysowaniem
+    tylko po zmianie ekranu. Zwraca słownik: tryb -> sekundy CPU na minutę.
+    """
+    results = {}
+    for idle in (False, True):
+        game = create_game({**config, 'idle_rendering': idle})
+        pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), loops=1)  # Zamknięcie gry
+        start = time.process_time()
+        game.run()
+        results["idle" if idle else "ciągłe"] = (time.process_time() - start) / seconds * 60
+    return results
+
+
+if __name__ == '__main__':
+    config = load_config()
+
+    print("=== Kolizje ===")
+    for mode, (micros, hits) in benchmark_collisions(config).items():
+        print(f"  {mode:<6} {micros:8.2f} µs/sprawdzenie, kolizji: {hits}")
+
+    print("=== Klatka rozgrywki (render) ===")
+    for (mode, background), millis in benchmark_gameplay_render(config).items():
+        print(f"  {mode:<6} tło {background:<8} {millis:8.3f} ms/klatkę")
+
+    print("=== Nachylenie ptaka ===")
+    for mode, micros in benchmark_bird_tilt(config).items():
+        print(f"  {mode:<7} {micros:8.2f} µs/klatkę")
+
+    print("=== Tło (budżet 1 ms/klatkę) ===")
+    for mode, (millis, ok) in benchmark_parallax(config).items():
+        print(f"  {mode:<7} {millis:8.3f} ms/klatkę {'OK' if ok else 'POZA BUDŻETEM'}")
+
+    print("=== Menu bez działań gracza (czas CPU) ===")
+    for mode, cpu in benchmark_idle_menu(config).items():
+        print(f"  {mode:<6} {cpu:8.2f} s CPU/minutę")
@@ -1,6 +1,36 @@
 import pygame
+from assets import assets
 from game_object import GameObject
 
+
+class BirdSprites:
+    """Grafiki ptaka obrócone raz przy wczytaniu, co step stopni, razem z maskami.
+
+    Narysowanie nachylonego ptaka to odczyt z tablicy i jeden blit - bez
+    wywoływania pygame.transform.rotate w każdej klatce.
+    """
+
+    min_angle = -90  # Nachylenie przy nurkowaniu
+    max_angle = 25  # Nachylenie przy wznoszeniu
+    tilt_per_speed = 4  # Stopnie nachylenia na jednostkę prędkości pionowej
+
+    def __init__(self, path, size, step=5):
+        self.step = step
+        # Kąt -> (grafika, maska, przesunięcie lewego górnego rogu względem prostokąta ptaka)
+        self.frames = {}
+        for angle in range(self.min_angle, self.max_angle + 1, step):
+            image = assets.get_image(path, size, angle=angle)
+            offset = (size[0] // 2 - image.get_width() // 2, size[1] // 2 - image.get_height() // 2)
+            self.frames[angle] = (image, assets.get_mask(path, size, angle=angle), offset)
+        self.last_angle = max(self.frames)  # Największy kąt z tablicy (przy step niebędącym dzielnikiem)
+
+    def angle(self, movement):
+        """Kąt z tablicy najbliższy nachyleniu dla prędkości pionowej movement."""
+        tilt = min(max(-movement * self.tilt_per_speed, self.min_angle), self.max_angle)
+        angle = self.min_angle + round((tilt - self.min_angle) / self.step) * self.step
+        return min(angle, self.last_angle)
+
+
 class Bird(GameObject):
     """Klasa reprezentująca ptaka w grze."""
     def __init__(self, x, y, size, gravity, jump_force):
@@ -9,6 +39,10 @@ class Bird(GameObject):
         self.jump_force = jump_force  # Siła skoku
         self.movement = 0           # Aktualna prędkość ruchu w pionie
         self.initial_y = y          # Początkowa pozycja Y (do resetu)
+        self.previous_y = y         # Pozycja Y przed ostatnim krokiem fizyki
+        # Obrócone grafiki i maski (wspólne dla wszystkich ptaków tego rozmiaru)
+        self.sprites = BirdSprites("bird.png", (size, size)) if self.image else None
+        self.angle = 0              # Bieżące nachylenie (klucz tablicy sprites)
 
         # Inicjalizacja dźwięku skoku
         try:
@@ -18,6 +52,19 @@ class Bird(GameObject):
             print(f"Nie można załadować dźwięku skoku: {e}")
             self.jump_sound = None
 
+    @property
+    def mask(self):
+        """Maska pikseli ptaka w bieżącym nachyleniu (None bez grafiki)."""
+        return self.sprites.frames[self.angle][1] if self.sprites else None
+
+    @property
+    def mask_rect(self):
+        """Prostokąt obróconej grafiki i maski - wyśrodkowany na prostokącie ptaka."""
+        if not self.sprites:
+            return self.rect
+        image, _, (dx, dy) = self.sprites.frames[self.angle]
+        return pygame.Rect(self.rect.x + dx, self.rect.y + dy, image.get_width(), image.get_height())
+
     def jump(self):
         """Wykonuje skok ptaka."""
         self.movement = -self.jump_force  # Ujemna wartość bo Y rośnie w dół
@@ -26,10 +73,23 @@ class Bird(GameObject):
 
     def update(self):
         """Aktualizuje pozycję ptaka na podstawie grawitacji."""
+        self.previous_y = self.rect.y
         self.movement += self.gravity
         self.rect.y += self.movement
+        if self.sprites:
+            self.angle = self.sprites.angle(self.movement)
 
     def reset(self):
         """Resetuje pozycję i prędkość ptaka."""
         self.rect.y = self.initial_y
-        self.movement = 0
\ No newline at end of file
+        self.previous_y = self.initial_y
+        self.movement = 0
+        self.angle = 0
+
+    def draw(self, screen, alpha=1.0):
+        """Rysuje ptaka między poprzednią a bieżącą pozycją (alpha od 0 do 1)."""
+        y = round(self.previous_y + (self.rect.y - self.previous_y) * alpha)
+        if not self.sprites:
+            return super().draw(screen, self.rect.move(0, y - self.rect.y))
+        image, _, (dx, dy) = self.sprites.frames[self.angle]
+        return screen.blit(image, (self.rect.x + dx, y + dy))
@@ -0,0 +1,64 @@
+import os
+from utils import plot_scores
+
+
+class ChartWorker:
+    """Generowanie wykresu wyników w osobnym procesie.
+
+    Kolejne zlecenia w trakcie generowania są pomijane, a gotowy wykres
+    jest używany ponownie, dopóki nie zmieni się wersja danych.
+    """
+
+    def __init__(self, output="top_scores.png"):
+        self.output = output  # Plik, do którego zapisywany jest wykres
+        self.version = None  # Wersja danych, dla której wykres jest aktualny
+        self.error = None  # Opis błędu ostatniego generowania
+        self._executor = None
+        self._future = None
+        self._pending_version = None
+
+    @property
+    def busy(self):
+        """Czy wykres jest właśnie generowany."""
+        return self._future is not None
+
+    def is_current(self, version):
+        """Czy istniejący plik wykresu odpowiada podanej wersji danych."""
+        return self.version == version and os.path.exists(self.output)
+
+    def request(self, top_players, version):
+        """Zleca wygenerowanie wykresu. Zwraca True, jeśli uruchomiono nowe zlecenie."""
+        if self.busy or self.is_current(version):
+            return False
+        if self._executor is None:
+            # Import na żądanie - pula procesów nie spowalnia startu gry
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # "spawn" - proces roboczy nie dziedziczy stanu pygame/SDL
+            self._executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            )
+        self.error = None
+        self._pending_version = version
+        self._future = self._executor.submit(plot_scores, None, list(top_players), False, self.output)
+        return True
+
+    def poll(self):
+        """Sprawdza stan zlecenia. Zwraca True dokładnie raz, gdy generowanie się zakończyło."""
+        if self._future is None or not self._future.done():
+            return False
+        try:
+            if self._future.result():
+                self.version = self._pending_version
+            else:
+                self.error = "Brak danych do wygenerowania wykresu"
+        except Exception as e:
+            self.error = str(e)
+        self._future = None
+        return True
+
+    def shutdown(self):
+        """Zamyka proces roboczy bez czekania na trwające zlecenie."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,357 @@
+import multiprocessing
+import os
+import random
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from pipe_spawner import PipeSpawner
+from simulation import BatchSimulation, round_half_away
+
+
+class FlappyBirdEnv:
+    """Środowisko w stylu Gym do trenowania i oceniania botów.
+
+    reset() zwraca obserwację, a step(action) - krotkę
+    (obserwacja, nagroda, koniec, info). Zasady gry pochodzą z BatchSimulation
+    (dla jednego ptaka zgodnej z Bird i Pipes), więc środowisko nie wymaga
+    pygame ani okna. Obserwacja to tablica float32:
+    [y ptaka, prędkość, odległość do końca najbliższej rury,
+    dolna krawędź górnej rury, górna krawędź dolnej rury].
+    Nagroda: +1 za każdą minięta parę rur, -1 za zderzenie.
+    """
+
+    observation_size = 5
+
+    def __init__(self, config=None, seed=None, max_frames=10000):
+        if config is None:
+            from utils import load_config
+            config = load_config()
+        self.config = config
+        self.max_frames = max_frames  # Limit długości epizodu
+        self._seeds = random.Random(seed)  # Ziarna kolejnych epizodów
+        self.simulation = BatchSimulation(config, 1, seed=self._seeds.getrandbits(32))
+        self._jump = np.zeros(1, dtype=bool)
+
+    def reset(self, seed=None):
+        """Rozpoczyna nowy epizod i zwraca pierwszą obserwację."""
+        self.simulation.seed = seed if seed is not None else self._seeds.getrandbits(32)
+        self.simulation.reset()
+        return self.observation()
+
+    def observation(self):
+        """Zwraca bieżącą obserwację."""
+        simulation = self.simulation
+        next_pipe = simulation.next_pipe()
+        if next_pipe is None:
+            # Brak rur - odstęp na środku ekranu tuż za prawą krawędzią
+            pipe_x, gap_pos = simulation.width, (simulation.height + simulation.pipe_gap) // 2
+        else:
+            pipe_x, gap_pos = next_pipe
+        return np.array([
+            simulation.y[0],
+            simulation.velocity[0],
+            pipe_x + simulation.pipe_width - simulation.bird_x,
+            gap_pos - simulation.pipe_gap,
+            gap_pos,
+        ], dtype=np.float32)
+
+    def step(self, action):
+        """Wykonuje jedną klatkę; action = 1 oznacza skok."""
+        simulation = self.simulation
+        score_before = simulation.score[0]
+        self._jump[0] = bool(action)
+        died = simulation.step(self._jump)[0]
+
+        reward = float(simulation.score[0] - score_before) - (1.0 if died else 0.0)
+        truncated = simulation.frame >= self.max_frames
+        info = {"score": int(simulation.score[0]), "frame": simulation.frame, "truncated": truncated}
+        return self.observation(), reward, bool(died) or truncated, info
+
+
+class BatchEnv:
+    """Wiele niezależnych środowisk FlappyBirdEnv liczonych razem na tablicach NumPy.
+
+    W odróżnieniu od BatchSimulation (jedna trasa rur dla wszystkich ptaków)
+    każde środowisko ma własną trasę, licznik klatek i epizody - wyniki są
+    identyczne z FlappyBirdEnv(config, seed=seeds[i]). Rury wszystkich środowisk
+    leżą w tablicach (środowisko, miejsce) z maską zajętych miejsc; w pętli
+    Pythona obsługiwane są tylko nowe pary rur i restarty epizodów.
+    Zakończone epizody są od razu restartowane, a ich wynik trafia do final_scores.
+    """
+
+    def __init__(self, config, seeds, max_frames=10000):
+        self.n_envs = len(seeds)
+        self.width = config['width']
+        self.height = config['height']
+        self.gravity = config['gravity']
+        self.jump_force = config['jump_force']
+        self.pipe_width = config['pipe_width']
+        self.pipe_gap = config['pipe_gap']
+        self.pipe_speed = config['pipe_speed']
+        self.pipe_spacing = config.get('pipe_spacing', 270)
+        self.max_frames = max_frames  # Limit długości epizodu
+        self._seeds = [random.Random(seed) for seed in seeds]  # Ziarna kolejnych epizodów
+        for seeds_rng in self._seeds:
+            seeds_rng.getrandbits(32)  # Ziarno trasy z konstruktora FlappyBirdEnv
+        self.spawners = [PipeSpawner(self.pipe_spacing, BatchSimulation.min_gap_pos,
+                                     BatchSimulation.max_gap_pos, 0) for _ in seeds]
+
+        n = self.n_envs
+        slots = (self.width + self.pipe_width + self.pipe_speed) // self.pipe_spacing + 2  # Pary na ekranie
+        self.y = np.zeros(n)
+        self.velocity = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.frame = np.zeros(n, dtype=np.int64)
+        self.final_scores = np.zeros(n, dtype=np.int64)  # Wynik ostatniego zakończonego epizodu
+        self.distance = np.zeros(n, dtype=np.int64)  # Przewinięta odległość trasy
+        self.next_spawn = np.zeros(n, dtype=np.int64)  # Odległość, przy której pojawi się następna para
+        self.culled = np.zeros(n, dtype=np.int64)  # Pary usunięte za lewą krawędzią ekranu
+        self.passed = np.zeros(n, dtype=np.int64)  # Pary minięte przez ptaka
+        self.pipe_x = np.zeros((n, slots), dtype=np.int64)
+        self.pipe_gap_pos = np.zeros((n, slots), dtype=np.int64)
+        self.pipe_active = np.zeros((n, slots), dtype=bool)
+        self._rows = np.arange(n)
+
+    def reset(self):
+        """Rozpoczyna nowe epizody we wszystkich środowiskach i zwraca obserwacje (n_envs, 5)."""
+        self._reset(np.ones(self.n_envs, dtype=bool))
+        return self.observations()
+
+    def _reset(self, envs):
+        """Restartuje środowiska wskazane maską envs."""
+        for i in np.flatnonzero(envs):
+            self.spawners[i].reset(self._seeds[i].getrandbits(32))
+        self.y[envs] = self.height // 2
+        self.velocity[envs] = 0
+        self.score[envs] = 0
+        self.frame[envs] = 0
+        self.distance[envs] = 0
+        self.next_spawn[envs] = self.pipe_spacing
+        self.culled[envs] = 0
+        self.passed[envs] = 0
+        self.pipe_active[envs] = False
+
+    def observations(self):
+        """Zwraca obserwacje wszystkich środowisk (jak FlappyBirdEnv.observation)."""
+        bird_x = BatchSimulation.bird_x
+        ahead = self.pipe_active & (self.pipe_x + self.pipe_width > bird_x)
+        nearest = np.where(ahead, self.pipe_x, np.iinfo(np.int64).max).argmin(axis=1)
+        has_pipe = ahead.any(axis=1)
+        # Brak rur - odstęp na środku ekranu tuż za prawą krawędzią
+        pipe_x = np.where(has_pipe, self.pipe_x[self._rows, nearest], self.width)
+        gap_pos = np.where(has_pipe, self.pipe_gap_pos[self._rows, nearest], (self.height + self.pipe_gap) // 2)
+        return np.stack([self.y, self.velocity, pipe_x + self.pipe_width - bird_x,
+                         gap_pos - self.pipe_gap, gap_pos], axis=1).astype(np.float32)
+
+    def step(self, actions):
+        """Wykonuje jedną klatkę we wszystkich środowiskach; actions - tablica skoków.
+
+        Zwraca (obserwacje, nagrody, końce epizodów, wyniki zakończonych epizodów)
+        z tymi samymi wartościami co FlappyBirdEnv.step.
+        """
+        bird_x, bird_size = BatchSimulation.bird_x, BatchSimulation.bird_size
+
+        # Skok i grawitacja (Bird.update)
+        self.velocity[np.asarray(actions, dtype=bool)] = -self.jump_force
+        self.velocity += self.gravity
+        self.y = round_half_away(self.y + self.velocity)
+
+        # Pipes.update - usunięcie rur za ekranem, przesunięcie, nowe pary według odległości
+        gone = self.pipe_active & (self.pipe_x <= -self.pipe_width)
+        self.culled += gone.sum(axis=1)
+        self.pipe_active &= ~gone
+        self.pipe_x -= self.pipe_speed
+        self.distance += self.pipe_speed
+        for i in np.flatnonzero(self.distance >= self.next_spawn):
+            while self.distance[i] >= self.next_spawn[i]:
+                slot = self.pipe_active[i].argmin()  # Pierwsze wolne miejsce
+                self.pipe_x[i, slot] = self.width - (self.distance[i] - self.next_spawn[i])
+                self.pipe_gap_pos[i, slot] = self.spawners[i].take_gap()
+                self.pipe_active[i, slot] = True
+                self.next_spawn[i] += self.pipe_spacing
+
+        # Kolizje z krawędziami ekranu i rurami nachodzącymi na ptaka w osi X
+        top = self.y[:, np.newaxis]
+        bottom = top + bird_size
+        overlap = self.pipe_active & (self.pipe_x < bird_x + bird_size) & (self.pipe_x + self.pipe_width > bird_x)
+        hit_top = (top < self.pipe_gap_pos - self.pipe_gap) & (bottom > 0)
+        hit_bottom = (top < self.height) & (bottom > self.pipe_gap_pos)
+        died = (self.y <= 0) | (self.y + bird_size >= self.height) | (overlap & (hit_top | hit_bottom)).any(axis=1)
+
+        # Pipes.update_score - punkt za każdą parę, której tylna krawędź minęła ptaka
+        passed = self.culled + (self.pipe_active & (self.pipe_x + self.pipe_width <= bird_x)).sum(axis=1)
+        gained = np.where(died, 0, np.maximum(passed - self.passed, 0))
+        self.passed = np.maximum(self.passed, passed)
+        self.score += gained
+        self.frame += 1
+
+        rewards = (gained - died).astype(np.float32)
+        dones = died | (self.frame >= self.max_frames)
+        if dones.any():
+            self.final_scores[dones] = self.score[dones]
+            self._reset(dones)
+        return self.observations(), rewards, dones, self.final_scores
+
+
+# Bufory współdzielone przez procesy VectorEnv: nazwa -> (kształt na środowisko, typ)
+_BUFFERS = {
+    "observations": ((FlappyBirdEnv.observation_size,), np.float32),
+    "actions": ((), np.int8),
+    "rewards": ((), np.float32),
+    "dones": ((), np.bool_),
+    "scores": ((), np.float32),  # Wynik zakończonego epizodu (ważny, gdy dones)
+}
+
+
+def _views(blocks, n_envs):
+    """Tworzy widoki NumPy na blokach pamięci współdzielonej."""
+    return {
+        name: np.ndarray((n_envs,) + _BUFFERS[name][0], dtype=_BUFFERS[name][1], buffer=block.buf)
+        for name, block in blocks.items()
+    }
+
+
+def _worker(conn, names, n_envs, start, end, config, seed, max_frames):
+    """Proces roboczy obsługujący środowiska o indeksach start..end-1."""
+    blocks = {name: shared_memory.SharedMemory(name=shm_name) for name, shm_name in names.items()}
+    arrays = _views(blocks, n_envs)
+    envs = BatchEnv(config, [seed + i for i in range(start, end)], max_frames=max_frames)
+    observations, actions = arrays["observations"], arrays["actions"]
+    rewards, dones, scores = arrays["rewards"], arrays["dones"], arrays["scores"]
+    try:
+        while True:
+            command = conn.recv()
+            if command == "reset":
+                observations[start:end] = envs.reset()
+            elif command == "step":
+                # Automatyczny reset w BatchEnv - scores to wyniki zakończonych epizodów
+                (observations[start:end], rewards[start:end],
+                 dones[start:end], scores[start:end]) = envs.step(actions[start:end])
+            else:
+                break
+            conn.send(True)
+    finally:
+        # Widoki muszą zniknąć przed zamknięciem bloków
+        del observations, actions, rewards, dones, scores, arrays
+        for block in blocks.values():
+            block.close()
+
+
+class VectorEnv:
+    """Wiele środowisk FlappyBirdEnv rozłożonych na pulę procesów.
+
+    Każdy proces liczy swoją część środowisk razem, na tablicach BatchEnv.
+    Obserwacje, akcje, nagrody i flagi końca epizodu są przekazywane przez
+    pamięć współdzieloną - procesom wysyłane są tylko krótkie polecenia.
+    Zakończone epizody są od razu restartowane; ich wynik trafia do scores.
+    Zwracane tablice są widokami na bufory współdzielone (ważne do kolejnego kroku).
+    """
+
+    def __init__(self, n_envs, n_workers=None, config=None, seed=0, max_frames=10000):
+        if config is None:
+            from utils import load_config
+            config = load_config()
+        self.n_envs = n_envs
+        n_workers = max(1, min(n_workers or os.cpu_count() or 1, n_envs))
+
+        self._blocks = {}
+        for name, (shape, dtype) in _BUFFERS.items():
+            size = n_envs * int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+            self._blocks[name] = shared_memory.SharedMemory(create=True, size=size)
+        names = {name: block.name for name, block in self._blocks.items()}
+        self.arrays = _views(self._blocks, n_envs)
+
+        # "spawn" - procesy robocze nie dziedziczą stanu pygame/SDL
+        context = multiprocessing.get_context("spawn")
+        self._connections = []
+        self._processes = []
+        bounds = np.linspace(0, n_envs, n_workers + 1).astype(int)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(child_conn, names, n_envs, int(start), int(end), config, seed, max_frames),
+                daemon=True
+            )
+            process.start()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+    def _broadcast(self, command):
+        """Wysyła polecenie do wszystkich procesów i czeka na potwierdzenia."""
+        for conn in self._connections:
+            conn.send(command)
+        for conn in self._connections:
+            conn.recv()
+
+    def reset(self):
+        """Restartuje wszystkie środowiska i zwraca obserwacje (n_envs, 5)."""
+        self._broadcast("reset")
+        return self.arrays["observations"]
+
+    def step(self, actions):
+        """Wykonuje krok we wszystkich środowiskach.
+
+        Zwraca (obserwacje, nagrody, końce epizodów, wyniki zakończonych epizodów).
+        """
+        self.arrays["actions"][:] = actions
+        self._broadcast("step")
+        return (self.arrays["observations"], self.arrays["rewards"],
+                self.arrays["dones"], self.arrays["scores"])
+
+    def close(self):
+        """Kończy procesy robocze i zwalnia pamięć współdzieloną."""
+        for conn in self._connections:
+            try:
+                conn.send("close")
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+        self._connections = []
+        self._processes = []
+        self.arrays = {}
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks = {}
+
+
+def benchmark_batch(n_envs=64, steps=2000, seed=0):
+    """Mierzy liczbę kroków na sekundę BatchEnv w jednym procesie dla losowej strategii."""
+    from utils import load_config
+    envs = BatchEnv(load_config(), [seed + i for i in range(n_envs)])
+    rng = np.random.default_rng(seed)
+    envs.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        envs.step(rng.random(n_envs) < 0.05)
+    return n_envs * steps / (time.perf_counter() - start)
+
+
+def benchmark(n_envs=64, n_workers=None, steps=2000, seed=0):
+    """Mierzy liczbę kroków środowisk na sekundę dla losowej strategii."""
+    vector_env = VectorEnv(n_envs, n_workers=n_workers, seed=seed)
+    rng = np.random.default_rng(seed)
+    try:
+        vector_env.reset()
+        start = time.perf_counter()
+        for _ in range(steps):
+            vector_env.step(rng.random(n_envs) < 0.05)
+        elapsed = time.perf_counter() - start
+    finally:
+        vector_env.close()
+    return n_envs * steps / elapsed
+
+
+if __name__ == '__main__':
+    single = FlappyBirdEnv(seed=0)
+    single.reset()
+    start = time.perf_counter()
+    for step in range(20000):
+        _, _, done, _ = single.step(step % 20 == 0)
+        if done:
+            single.reset()
+    print(f"1 środowisko: {20000 / (time.perf_counter() - start):,.0f} kroków/s")
+    print(f"BatchEnv (64 środowiska, 1 proces): {benchmark_batch():,.0f} kroków/s")
+    print(f"VectorEnv (64 środowiska): {benchmark():,.0f} kroków/s")
@@ -1,12 +1,26 @@
 import pygame
 import json
+import os
+import time
+from background import ParallaxBackground
 from bird import Bird
+from charts import ChartWorker
 from pipes import Pipes
-from utils import load_config, save_score, load_scores, get_player_scores
+from replay import ReplayRecorder
+from assets import assets
+from score_index import PlayerSearchIndex, Leaderboard
+from score_store import ScoreWriter
+from text_cache import TextCache, DigitAtlas
+from ui import UILayout, ButtonSprites
+from utils import load_config, configure_scores, save_scores, load_scores, StartupProfiler, FixedTimestep
 
 
 class FlappyBirdGame:
-    def __init__(self):
+    def __init__(self, profiler=None, profile_startup=False, config=None, player_name=""):
+        # Pomiar czasu uruchamiania (raport po pierwszej klatce z --profile-startup)
+        self.profiler = profiler or StartupProfiler()
+        self.profile_startup = profile_startup
+
         # Kolory używane w grze
         self.orange_color = (255, 165, 0)
         self.dark_orange = (200, 120, 0)
@@ -14,9 +28,20 @@ class FlappyBirdGame:
         self.black = (0, 0, 0)
 
         # Wczytanie konfiguracji i wyników
-        self.config = load_config()
-        self.scores_data = load_scores()
-        self.player_name = ""
+        with self.profiler.section("konfiguracja i wyniki"):
+            self.config = config if config is not None else load_config()
+            configure_scores(self.config)
+            self.scores_data = load_scores()
+            self.score_writer = ScoreWriter(save_scores)  # Zapis wyników w osobnym wątku
+            self.score_index = PlayerSearchIndex(self.scores_data["players"])  # Wyszukiwanie w pamięci
+            self.leaderboard = Leaderboard(self.scores_data["players"], self.scores_data.get('high_score', 0))
+        self.chart_worker = ChartWorker()  # Wykres wyników generowany w osobnym procesie
+        self.last_result = None  # (wynik, pozycja, liczba wyników) ostatniej gry
+        self.player_name = player_name  # Bez nazwy gra pyta o nią przy starcie
+        # Nagrywanie rozgrywek (ziarno trasy i klatki skoków)
+        self.recorder = ReplayRecorder()
+        self.last_replay = None  # Nagranie ostatniej zakończonej gry
+        self.replaying = False  # Trwa odtwarzanie nagrania - wyniki nie są zapisywane
         self.setup_game()
         self.check_first_run()
 
@@ -35,52 +60,156 @@ class FlappyBirdGame:
         self.search_term = ""
         self.search_active = False
 
+        # Stan wyświetlania wykresu wyników
+        self.chart_visible = False
+        self.chart_image = None
+
+        # Nakładka diagnostyczna (F3)
+        self.debug_overlay = False
+
+        # Ostatnio narysowany stan ekranu poza rozgrywką (None - do narysowania)
+        self.idle_view = None
+
+        # Ostatnio narysowany ekran ("game", "menu" lub None) i prostokąty
+        # ruchomych elementów z ostatniej klatki (do odświeżania fragmentów ekranu)
+        self.drawn_screen = None
+        self.dirty_rects = []
+
         # Inicjalizacja muzyki
         self.music_playing = False
-        self.init_music()
+        with self.profiler.section("mikser i muzyka"):
+            self.init_music()
 
     def setup_game(self):
         """Inicjalizacja podstawowych elementów gry."""
-        pygame.init()
-        pygame.mixer.init()
-        self.screen = pygame.display.set_mode(
-            (self.config['width'], self.config['height'])
-        )
-        pygame.display.set_caption("Flappy Bird - Projekt Python")
+        with self.profiler.section("pygame i okno"):
+            # Moduły inicjalizowane osobno - pygame.init() uruchomiłby też mikser,
+            # a czas jego startu trafiłby do tego etapu
+            pygame.display.init()
+            pygame.font.init()
+            self.canvas = None
+            self.create_window()
+            pygame.display.set_caption("Flappy Bird - Projekt Python")
+        with self.profiler.section("mikser i muzyka"):
+            pygame.mixer.init()
 
         # Wczytanie tła
-        try:
-            self.background = pygame.image.load("tlo.png").convert()
-            self.background = pygame.transform.scale(self.background, (self.config['width'], self.config['height']))
-        except pygame.error:
-            self.background = None
-
-        # Inicjalizacja zegara i czcionek
+        with self.profiler.section("zasoby graficzne"):
+            try:
+                self.background = assets.get_image(
+                    "tlo.png", (self.config['width'], self.config['height']), mode="opaque"
+                )
+            except pygame.error:
+                self.background = None
+            # Przewijane warstwy tła przygotowane raz (bez grafiki lub warstw - tło stałe)
+            self.parallax = None
+            if self.background and self.config['parallax_layers']:
+                self.parallax = ParallaxBackground.from_config(self.background, self.config)
+
+        # Inicjalizacja zegara, kroku fizyki i czcionek
         self.clock = pygame.time.Clock()
-        self.font_large = pygame.font.SysFont('Arial', 50, bold=True)
-        self.font_medium = pygame.font.SysFont('Arial', 30, bold=True)
-        self.font_small = pygame.font.SysFont('Arial', 20)
+        self.timestep = FixedTimestep(self.config['physics_hz'], self.config['max_physics_steps'])
+        with self.profiler.section("czcionki"):
+            self.font_large = pygame.font.SysFont('Arial', 50, bold=True)
+            self.font_medium = pygame.font.SysFont('Arial', 30, bold=True)
+            self.font_small = pygame.font.SysFont('Arial', 20)
+            # Napisy renderowane raz i używane w kolejnych klatkach
+            self.text_cache = TextCache()
+            self.score_digits = DigitAtlas(self.font_medium, self.white)
+            # Przyciski rysowane raz i geometria ekranów liczona raz dla rozdzielczości
+            self.buttons = ButtonSprites(self.font_medium, self.orange_color, self.dark_orange,
+                                         self.black, self.black)
+            self.layout = UILayout(self.config['width'], self.config['height'])
 
         # Inicjalizacja ptaka i rur
-        self.bird = Bird(
-            x=100,
-            y=self.config['height'] // 2,
-            size=30,
-            gravity=self.config['gravity'],
-            jump_force=self.config['jump_force']
-        )
-
-        self.pipes = Pipes(
-            width=self.config['pipe_width'],
-            gap=self.config['pipe_gap'],
-            speed=self.config['pipe_speed']
-        )
+        with self.profiler.section("zasoby graficzne"):
+            self.bird = Bird(
+                x=100,
+                y=self.config['height'] // 2,
+                size=30,
+                gravity=self.config['gravity'],
+                jump_force=self.config['jump_force']
+            )
+
+            self.pipes = Pipes(
+                width=self.config['pipe_width'],
+                gap=self.config['pipe_gap'],
+                speed=self.config['pipe_speed'],
+                spacing=self.config['pipe_spacing'],
+                collision_mode=self.config['collision_mode'],
+                screen_width=self.config['width']
+            )
+            self.pipes.prepare_renderer(self.config['height'])  # Grafiki rur budowane raz
 
         # Inicjalizacja wyników
         self.score = 0
-        self.high_score = self.scores_data.get('high_score', 0)
+        self.high_score = self.leaderboard.high_score
         self.game_active = False
 
+    def create_window(self):
+        """Tworzy okno o rozmiarze ekranu logicznego powiększonym window_scale razy.
+
+        Gra rysuje zawsze na ekranie logicznym (self.screen) o rozmiarze z konfiguracji.
+        Przy skali 1 jest nim samo okno, przy większej - osobna powierzchnia
+        powiększana do okna raz na klatkę (present).
+        """
+        width, height = self.config['width'], self.config['height']
+        self.scale = max(int(self.config['window_scale']), 1)
+        self.window = pygame.display.set_mode((width * self.scale, height * self.scale))
+        if self.scale == 1:
+            self.screen = self.window
+        else:
+            if self.canvas is None:
+                self.canvas = pygame.Surface((width, height))
+            self.screen = self.canvas
+
+    def max_window_scale(self):
+        """Największe całkowite powiększenie, przy którym okno mieści się na monitorze."""
+        desktop_width, desktop_height = (pygame.display.get_desktop_sizes() or [(0, 0)])[0]
+        return max(min(desktop_width // self.config['width'], desktop_height // self.config['height']), 1)
+
+    def set_window_scale(self, scale):
+        """Zmienia powiększenie okna - grafiki i układ ekranów pozostają bez zmian."""
+        self.config['window_scale'] = scale
+        self.create_window()
+        self.drawn_screen = None  # Nowe okno trzeba narysować w całości
+        self.idle_view = None
+
+    def present(self, rects=None):
+        """Wyświetla klatkę z ekranu logicznego - całą lub tylko obszary rects.
+
+        Przy powiększeniu obraz jest skalowany bez wygładzania (najbliższy
+        sąsiad), a w trybie obszarów skalowane są tylko ich wycinki.
+        """
+        if self.scale == 1:
+            if rects is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(rects)
+            return
+
+        if rects is None:
+            pygame.transform.scale(self.screen, self.window.get_size(), self.window)
+            pygame.display.update()
+            return
+
+        scale = self.scale
+        screen_rect = self.screen.get_rect()
+        scaled = []
+        for rect in rects:
+            rect = rect.clip(screen_rect)
+            if not rect.width or not rect.height:
+                continue
+            target = pygame.Rect(rect.x * scale, rect.y * scale, rect.width * scale, rect.height * scale)
+            pygame.transform.scale(self.screen.subsurface(rect), target.size, self.window.subsurface(target))
+            scaled.append(target)
+        pygame.display.update(scaled)
+
+    def mouse_pos(self):
+        """Pozycja kursora przeliczona na ekran logiczny."""
+        x, y = pygame.mouse.get_pos()
+        return x // self.scale, y // self.scale
+
     def init_music(self):
         """Inicjalizacja muzyki w tle."""
         try:
@@ -108,7 +237,7 @@ class FlappyBirdGame:
         while input_active:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
+                    self.shutdown()
                     exit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_RETURN and name:
@@ -121,47 +250,42 @@ class FlappyBirdGame:
 
             # Rysowanie interfejsu wprowadzania nazwy
             self.screen.fill(self.config['bg_color'])
-            title = font_title.render("Wprowadź swoją nazwę", True, self.white)
+            title = self.text_cache.render(font_title, "Wprowadź swoją nazwę", True, self.white)
             self.screen.blit(title, (self.config['width'] // 2 - title.get_width() // 2, 100))
 
             # Pole wprowadzania tekstu
-            name_text = font_input.render(name, True, self.white)
+            name_text = self.text_cache.render(font_input, name, True, self.white)
             pygame.draw.rect(self.screen, self.white,
                              (self.config['width'] // 2 - 150, 180, 300, 40), 2, border_radius=10)
             self.screen.blit(name_text, (self.config['width'] // 2 - name_text.get_width() // 2, 190))
 
             # Podpowiedź
-            prompt = font_prompt.render("Naciśnij Enter aby kontynuować", True, self.white)
+            prompt = self.text_cache.render(font_prompt, "Naciśnij Enter aby kontynuować",
+                                            True, self.white)
             self.screen.blit(prompt, (self.config['width'] // 2 - prompt.get_width() // 2, 250))
 
-            pygame.display.flip()
+            self.present()
+            self.frame_presented()
             self.clock.tick(self.config['fps'])
 
-    def draw_button(self, x, y, width, height, text, is_selected=False, is_hovered=False):
-        """Rysuje przycisk na ekranie."""
-        button_color = self.dark_orange if is_selected or is_hovered else self.orange_color
-        pygame.draw.rect(self.screen, button_color, (x, y, width, height), border_radius=15)
-        pygame.draw.rect(self.screen, self.black, (x, y, width, height), 2, border_radius=15)
-
-        text_surface = self.font_medium.render(text, True, self.black)
-        text_rect = text_surface.get_rect(center=(x + width // 2, y + height // 2))
-        self.screen.blit(text_surface, text_rect)
-        return pygame.Rect(x, y, width, height)
+    def draw_button(self, rect, text, is_selected=False, is_hovered=False):
+        """Rysuje gotowy przycisk w miejscu prostokąta."""
+        self.screen.blit(self.buttons.get(rect.size, text, is_selected or is_hovered), rect)
+        return rect
 
-    def handle_events(self):
-        """Obsługuje zdarzenia w grze."""
+    def handle_events(self, events=None):
+        """Obsługuje zdarzenia w grze (domyślnie pobrane z kolejki pygame)."""
         running = True
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.mouse_pos()
 
-        for event in pygame.event.get():
+        for event in pygame.event.get() if events is None else events:
             if event.type == pygame.QUIT:
                 running = False
 
-            if event.type == self.pipes.spawn_pipe_event and self.game_active:
-                self.pipes.add_pipe(self.config['height'])
-
             if event.type == pygame.KEYDOWN:
-                if self.menu_active and not self.options_active and not self.scores_active:
+                if event.key == pygame.K_F3:
+                    self.debug_overlay = not self.debug_overlay
+                elif self.menu_active and not self.options_active and not self.scores_active:
                     if event.key == pygame.K_DOWN:
                         self.selected_menu_item = (self.selected_menu_item + 1) % len(self.menu_items)
                     elif event.key == pygame.K_UP:
@@ -178,7 +302,9 @@ class FlappyBirdGame:
                     elif event.key == pygame.K_ESCAPE:
                         self.options_active = False
                 elif self.scores_active:
-                    if event.key == pygame.K_ESCAPE:
+                    if event.key == pygame.K_ESCAPE and self.chart_visible:
+                        self.chart_visible = False
+                    elif event.key == pygame.K_ESCAPE:
                         self.scores_active = False
                     elif self.search_active:
                         if event.key == pygame.K_RETURN:
@@ -191,16 +317,16 @@ class FlappyBirdGame:
                         else:
                             self.search_term += event.unicode
                 elif event.key == pygame.K_SPACE and self.game_active:
-                    self.bird.jump()
+                    self.jump()
                 elif event.key == pygame.K_ESCAPE and self.game_active:
                     self.game_active = False
                     self.menu_active = True
 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
+                mouse_pos = self.mouse_pos()
 
                 if self.game_active:
-                    self.bird.jump()
+                    self.jump()
                 elif self.menu_active and not self.options_active and not self.scores_active:
                     self.check_menu_click(mouse_pos)
                 elif self.options_active:
@@ -210,6 +336,11 @@ class FlappyBirdGame:
 
         return running
 
+    def jump(self):
+        """Skok ptaka gracza - zapisywany w nagraniu rozgrywki."""
+        self.recorder.jump()
+        self.bird.jump()
+
     def handle_menu_selection(self):
         """Obsługuje wybór opcji w menu głównym."""
         if self.selected_menu_item == 0:  # Start
@@ -220,113 +351,139 @@ class FlappyBirdGame:
         elif self.selected_menu_item == 2:  # Wyniki
             self.scores_active = True
         elif self.selected_menu_item == 3:  # Wyjdź
-            pygame.quit()
+            self.shutdown()
             exit()
 
     def handle_options_selection(self):
         """Obsługuje wybór opcji w menu opcji."""
-        if self.selected_option == 4:  # Zmień nazwę
+        if self.selected_option == 0:  # Rozdzielczość - kolejne powiększenie okna
+            self.set_window_scale(self.scale % self.max_window_scale() + 1)
+        elif self.selected_option == 4:  # Zmień nazwę
             self.show_name_input()
         elif self.selected_option == 5:  # Powrót
             self.options_active = False
 
     def check_menu_click(self, mouse_pos):
         """Sprawdza kliknięcie w przyciski menu głównego."""
-        button_width = 200
-        button_height = 50
-        start_y = 200
-
-        for i, item in enumerate(self.menu_items):
-            button_rect = pygame.Rect(
-                self.config['width'] // 2 - button_width // 2,
-                start_y + i * (button_height + 20),
-                button_width,
-                button_height
-            )
-            if button_rect.collidepoint(mouse_pos):
-                self.selected_menu_item = i
-                self.handle_menu_selection()
-                break
+        i = self.layout.hit(self.layout.menu_buttons, mouse_pos)
+        if i is not None:
+            self.selected_menu_item = i
+            self.handle_menu_selection()
 
     def check_options_click(self, mouse_pos):
         """Sprawdza kliknięcie w przyciski menu opcji."""
-        button_width = 300
-        button_height = 40
-        start_y = 150
-
-        for i in range(6):  # 6 opcji w menu opcji
-            button_rect = pygame.Rect(
-                self.config['width'] // 2 - button_width // 2,
-                start_y + i * (button_height + 10),
-                button_width,
-                button_height
-            )
-            if button_rect.collidepoint(mouse_pos):
-                self.selected_option = i
-                self.handle_options_selection()
-                break
+        i = self.layout.hit(self.layout.option_buttons, mouse_pos)
+        if i is not None:
+            self.selected_option = i
+            self.handle_options_selection()
 
     def handle_scores_click(self, mouse_pos):
         """Obsługuje kliknięcia w ekranie wyników."""
-        plot_button_rect, back_button_rect = self.render_high_scores()
+        layout = self.layout
 
         # Sprawdź kliknięcie w pole wyszukiwania
-        search_rect = pygame.Rect(self.config['width'] // 2 - 150, 120, 300, 30)
-        if search_rect.collidepoint(mouse_pos):
+        if layout.search_field.collidepoint(mouse_pos):
             self.search_active = True
             self.search_term = ""
 
         # Sprawdź kliknięcie przycisku "Wszyscy"
-        all_rect = pygame.Rect(self.config['width'] // 2 - 200, 160, 100, 30)
-        if all_rect.collidepoint(mouse_pos):
+        if layout.all_button.collidepoint(mouse_pos):
             self.search_mode = "all"
             self.search_active = False
 
         # Sprawdź kliknięcie przycisku "Szukaj"
-        search_btn_rect = pygame.Rect(self.config['width'] // 2 + 100, 160, 100, 30)
-        if search_btn_rect.collidepoint(mouse_pos):
+        if layout.search_button.collidepoint(mouse_pos):
             self.search_mode = "search"
             self.search_active = False
 
-        # Sprawdź kliknięcie przycisku "Generuj wykres"
-        if plot_button_rect.collidepoint(mouse_pos):
-            from utils import plot_scores
-            plot_scores()
-            self.scores_data = load_scores()
-            pygame.time.delay(300)
+        # Sprawdź kliknięcie przycisku "Pokaż wykres"
+        if layout.chart_button.collidepoint(mouse_pos):
+            self.toggle_chart()
 
         # Sprawdź kliknięcie przycisku "Powrót"
-        if back_button_rect.collidepoint(mouse_pos):
+        if layout.back_button.collidepoint(mouse_pos):
             self.scores_active = False
 
-    def start_game(self):
-        """Rozpoczyna nową grę."""
+    def toggle_chart(self):
+        """Pokazuje lub ukrywa wykres wyników.
+
+        Wykres jest generowany w osobnym procesie tylko wtedy, gdy od ostatniego
+        wykresu zmieniły się wyniki; kolejne kliknięcia w trakcie generowania są pomijane.
+        """
+        self.chart_visible = not self.chart_visible
+        if not self.chart_visible:
+            return
+
+        version = self.leaderboard.count  # Zmienia się przy każdym nowym wyniku
+        if self.chart_worker.is_current(version):
+            if self.chart_image is None:
+                self.chart_image = self.load_chart_image()
+        elif self.chart_worker.request(self.leaderboard.top_players(10), version):
+            self.chart_image = None
+
+    def load_chart_image(self):
+        """Wczytuje gotowy wykres i skaluje go do obszaru wyników."""
+        try:
+            image = pygame.image.load(self.chart_worker.output).convert()
+        except pygame.error as e:
+            self.chart_worker.error = str(e)
+            return None
+        scale = min(300 / image.get_width(), 320 / image.get_height())
+        size = (int(image.get_width() * scale), int(image.get_height() * scale))
+        return pygame.transform.smoothscale(image, size)
+
+    def start_game(self, seed=None):
+        """Rozpoczyna nową grę (bez ziarna - na losowej trasie)."""
         self.menu_active = False
         self.game_active = True
-        self.reset_game()
+        self.reset_game(seed)
+
+    def poll_chart(self):
+        """Odbiera wykres z procesu roboczego (bez czekania)."""
+        if self.chart_worker.poll() and self.chart_worker.error is None:
+            self.chart_image = self.load_chart_image()
 
     def update(self):
-        """Aktualizuje stan gry."""
+        """Wykonuje jeden krok fizyki gry."""
         if self.game_active:
+            self.recorder.step()
+            if self.parallax:
+                self.parallax.update()
             self.bird.update()
             self.pipes.update()
 
             # Sprawdzenie kolizji
-            if self.pipes.check_collision(self.bird.rect) or \
+            if self.pipes.check_collision(self.bird.rect, self.bird.mask, self.bird.mask_rect) or \
                     self.bird.rect.top <= 0 or \
                     self.bird.rect.bottom >= self.config['height']:
                 self.game_over()
+            else:
+                # Wynik liczy się tylko, gdy ptak przeżył krok (jak w BatchSimulation)
+                self.score = self.pipes.update_score(self.bird.rect.x, self.score)
+
+    def render(self, alpha=1.0):
+        """Renderuje grę na ekranie.
+
+        alpha - położenie między dwoma ostatnimi krokami fizyki (interpolacja ruchu).
+        W trybie render_mode "dirty" klatki rozgrywki odświeżają tylko obszary
+        ruchomych elementów; pierwsza klatka po zmianie ekranu jest rysowana w całości.
+        Z przewijanym tłem dochodzą do nich całe pasy warstw, które przesunęły się
+        od poprzedniej klatki.
+        """
+        if self.game_active and self.drawn_screen == "game" and self.config['render_mode'] == "dirty":
+            self.render_dirty(alpha)
+            self.frame_presented()
+            return
 
-            self.score = self.pipes.update_score(self.bird.rect.x, self.score)
-
-    def render(self):
-        """Renderuje grę na ekranie."""
         # Rysowanie tła
-        if self.background:
+        if self.parallax:
+            self.parallax.draw(self.screen, alpha)
+        elif self.background:
             self.screen.blit(self.background, (0, 0))
         else:
             self.screen.fill(self.config['bg_color'])
 
+        self.dirty_rects = []
         if self.scores_active:
             self.render_high_scores()
         elif self.menu_active:
@@ -335,60 +492,118 @@ class FlappyBirdGame:
             else:
                 self.render_menu()
         elif self.game_active:
-            self.pipes.draw(self.screen)
-            self.bird.draw(self.screen)
-            score_text = self.font_medium.render(f"Wynik: {int(self.score)}", True, self.white)
-            self.screen.blit(score_text, (20, 20))
-            name_text = self.font_small.render(f"Gracz: {self.player_name}", True, self.white)
-            self.screen.blit(name_text, (20, 50))
-
-        pygame.display.update()
+            self.dirty_rects = self.render_gameplay(alpha)
+
+        if self.debug_overlay:
+            self.dirty_rects.extend(self.render_debug_overlay())
+        self.drawn_screen = "game" if self.game_active else "menu"
+
+        self.present()
+        self.frame_presented()
+
+    def render_gameplay(self, alpha):
+        """Rysuje rury, ptaka i licznik wyniku. Zwraca listę narysowanych prostokątów."""
+        drawn = []
+        self.pipes.draw(self.screen, alpha, drawn)
+        drawn.append(self.bird.draw(self.screen, alpha))
+        score_label = self.text_cache.render(self.font_medium, "Wynik: ", True, self.white)
+        drawn.append(self.screen.blit(score_label, (20, 20)))
+        drawn.append(self.score_digits.draw(self.screen, str(int(self.score)),
+                                            (20 + score_label.get_width(), 20)))
+        name_text = self.text_cache.render(self.font_small, f"Gracz: {self.player_name}", True, self.white)
+        drawn.append(self.screen.blit(name_text, (20, 50)))
+        screen_rect = self.screen.get_rect()
+        return [rect.clip(screen_rect) for rect in drawn]
+
+    def render_dirty(self, alpha):
+        """Klatka rozgrywki odświeżająca tylko poprzednie i nowe miejsca ruchomych elementów."""
+        previous = self.dirty_rects
+        if self.parallax:
+            # Przesunięte warstwy rysowane w całości, w pozostałych tylko tło pod elementami
+            previous = previous + self.parallax.draw_changed(self.screen, alpha, previous)
+        else:
+            for rect in previous:
+                # Przywrócenie tła pod elementami z poprzedniej klatki
+                if self.background:
+                    self.screen.blit(self.background, rect, rect)
+                else:
+                    self.screen.fill(self.config['bg_color'], rect)
+
+        current = self.render_gameplay(alpha)
+        if self.debug_overlay:
+            current.extend(self.render_debug_overlay())
+        self.dirty_rects = current
+        self.present(previous + current)
+
+    def render_debug_overlay(self):
+        """Rysuje nakładkę diagnostyczną: FPS i skuteczność pamięci podręcznych.
+
+        Zwraca listę narysowanych prostokątów.
+        """
+        text_stats = self.text_cache.stats()
+        asset_stats = assets.stats()
+        asset_total = asset_stats["hits"] + asset_stats["misses"]
+        lines = [
+            f"FPS: {self.clock.get_fps():.0f}",
+            f"Napisy: {text_stats['hit_rate']:.1%} trafień, {text_stats['entries']} w pamięci",
+            f"Grafiki: {asset_stats['hits'] / asset_total if asset_total else 0:.1%} trafień, "
+            f"{asset_stats['bytes'] / 1024:.0f} KB",
+        ]
+        # Napisy nakładki zmieniają się co klatkę - renderowane bez pamięci podręcznej,
+        # żeby nie zaburzać jej statystyk
+        drawn = []
+        y = self.config['height'] - 22 * len(lines) - 5
+        for line in lines:
+            surface = self.font_small.render(line, True, (255, 255, 0), (0, 0, 0))
+            drawn.append(self.screen.blit(surface, (5, y)))
+            y += 22
+        return drawn
+
+    def frame_presented(self):
+        """Wywoływane po wyświetleniu klatki - kończy pomiar czasu uruchamiania."""
+        if not self.profiler.mark_first_frame() or not self.profile_startup:
+            return
+        budget = self.config.get('startup_budget_ms')
+        print(self.profiler.report(budget))
+        self.shutdown()
+        exit(0 if budget is None or self.profiler.within_budget(budget) else 1)
 
     def render_menu(self):
         """Renderuje menu główne."""
-        title = self.font_large.render("Flappy Bird", True, self.white)
+        title = self.text_cache.render(self.font_large, "Flappy Bird", True, self.white)
         self.screen.blit(title, (self.config['width'] // 2 - title.get_width() // 2, 100))
 
-        mouse_pos = pygame.mouse.get_pos()
-        button_width = 200
-        button_height = 50
-        start_y = 200
-
         # Renderowanie przycisków menu
-        for i, item in enumerate(self.menu_items):
-            button_rect = self.draw_button(
-                self.config['width'] // 2 - button_width // 2,
-                start_y + i * (button_height + 20),
-                button_width,
-                button_height,
-                item,
-                i == self.selected_menu_item,
-                self.is_button_hovered(mouse_pos, self.config['width'] // 2 - button_width // 2,
-                                       start_y + i * (button_height + 20),
-                                       button_width, button_height)
-            )
+        mouse_pos = self.mouse_pos()
+        for i, (item, rect) in enumerate(zip(self.menu_items, self.layout.menu_buttons)):
+            self.draw_button(rect, item, i == self.selected_menu_item, rect.collidepoint(mouse_pos))
 
         # Wyświetlanie rekordu i nazwy gracza
-        high_score = self.font_small.render(f"Rekord: {int(self.high_score)}", True, self.white)
+        high_score = self.text_cache.render(self.font_small, f"Rekord: {int(self.high_score)}",
+                                            True, self.white)
         self.screen.blit(high_score,
                          (self.config['width'] // 2 - high_score.get_width() // 2, 480))
 
-        player_text = self.font_small.render(f"Gracz: {self.player_name}", True, self.white)
+        player_text = self.text_cache.render(self.font_small, f"Gracz: {self.player_name}", True, self.white)
         self.screen.blit(player_text,
                          (self.config['width'] // 2 - player_text.get_width() // 2, 510))
 
-    def is_button_hovered(self, mouse_pos, x, y, width, height):
-        """Sprawdza, czy kursor myszy znajduje się nad przyciskiem."""
-        button_rect = pygame.Rect(x, y, width, height)
-        return button_rect.collidepoint(mouse_pos)
+        # Wynik i pozycja w rankingu z ostatniej gry
+        if self.last_result:
+            score, rank, total = self.last_result
+            rank_text = self.text_cache.render(
+                self.font_small, f"Ostatnia gra: {int(score)} (miejsce {rank}/{total})", True, self.white
+            )
+            self.screen.blit(rank_text,
+                             (self.config['width'] // 2 - rank_text.get_width() // 2, 540))
 
     def render_options(self):
         """Renderuje menu opcji."""
-        title = self.font_large.render("Opcje", True, self.white)
+        title = self.text_cache.render(self.font_large, "Opcje", True, self.white)
         self.screen.blit(title, (self.config['width'] // 2 - title.get_width() // 2, 50))
 
         options = [
-            f"Rozdzielczość: {self.config['width']}x{self.config['height']}",
+            f"Rozdzielczość: {self.config['width'] * self.scale}x{self.config['height'] * self.scale}",
             f"Grawitacja: {self.config['gravity']}",
             f"Siła skoku: {self.config['jump_force']}",
             f"Twoja nazwa: {self.player_name}",
@@ -396,123 +611,230 @@ class FlappyBirdGame:
             "Powrót"
         ]
 
-        mouse_pos = pygame.mouse.get_pos()
-        button_width = 300
-        button_height = 40
-        start_y = 150
-
-        for i, option in enumerate(options):
-            button_rect = self.draw_button(
-                self.config['width'] // 2 - button_width // 2,
-                start_y + i * (button_height + 10),
-                button_width,
-                button_height,
-                option,
-                i == self.selected_option,
-                self.is_button_hovered(mouse_pos, self.config['width'] // 2 - button_width // 2,
-                                       start_y + i * (button_height + 10),
-                                       button_width, button_height)
-            )
+        mouse_pos = self.mouse_pos()
+        for i, (option, rect) in enumerate(zip(options, self.layout.option_buttons)):
+            self.draw_button(rect, option, i == self.selected_option, rect.collidepoint(mouse_pos))
 
     def render_high_scores(self):
         """Renderuje ekran z najlepszymi wynikami."""
         self.screen.fill(self.config['bg_color'])
-        title = self.font_large.render("Najlepsze wyniki", True, self.white)
+        title = self.text_cache.render(self.font_large, "Najlepsze wyniki", True, self.white)
         self.screen.blit(title, (self.config['width'] // 2 - title.get_width() // 2, 50))
 
         # Pole wyszukiwania
-        search_rect = pygame.Rect(self.config['width'] // 2 - 150, 120, 300, 30)
-        pygame.draw.rect(self.screen, (50, 50, 100), search_rect, border_radius=5)
+        layout = self.layout
+        pygame.draw.rect(self.screen, (50, 50, 100), layout.search_field, border_radius=5)
 
         if self.search_active:
             search_text = self.search_term
             cursor = "|" if pygame.time.get_ticks() % 1000 < 500 else ""
-            search_surface = self.font_small.render(search_text + cursor, True, self.white)
+            search_surface = self.text_cache.render(self.font_small, search_text + cursor, True, self.white)
         else:
             search_text = "Wyszukaj gracza..." if not self.search_term else self.search_term
-            search_surface = self.font_small.render(search_text, True, self.white)
-        self.screen.blit(search_surface, (self.config['width'] // 2 - 140, 125))
+            search_surface = self.text_cache.render(self.font_small, search_text, True, self.white)
+        self.screen.blit(search_surface, (layout.search_field.x + 10, layout.search_field.y + 5))
 
         # Przyciski filtrowania
-        mouse_pos = pygame.mouse.get_pos()
-        all_button = self.draw_button(
-            self.config['width'] // 2 - 200, 160, 100, 30, "Wszyscy",
-            self.search_mode == "all", False
-        )
-        search_button = self.draw_button(
-            self.config['width'] // 2 + 100, 160, 100, 30, "Szukaj",
-            self.search_mode == "search", False
-        )
+        mouse_pos = self.mouse_pos()
+        self.draw_button(layout.all_button, "Wszyscy", self.search_mode == "all")
+        self.draw_button(layout.search_button, "Szukaj", self.search_mode == "search")
 
         # Tło dla wyników
-        results_bg_rect = pygame.Rect(
-            self.config['width'] // 2 - 150, 200, 300, 320
-        )
-        pygame.draw.rect(self.screen, (50, 50, 100), results_bg_rect, border_radius=15)
-
-        # Pobierz i wyświetl wyniki
-        if self.search_mode == "all":
-            scores_to_show = sorted(self.scores_data["players"], key=lambda x: x["score"], reverse=True)[:10]
+        pygame.draw.rect(self.screen, (50, 50, 100), layout.results_area, border_radius=15)
+
+        if self.chart_visible:
+            self.render_chart(layout.results_area)
         else:
-            scores_to_show = get_player_scores(self.search_term if self.search_term else " ")
+            # Pobierz i wyświetl wyniki
+            if self.search_mode == "all":
+                scores_to_show = self.leaderboard.top(10)
+            else:
+                scores_to_show = self.score_index.search(self.search_term if self.search_term else " ", limit=10)
 
-        score_texts = list(map(
-            lambda s: f"{s['name']}: {int(s['score'])}",
-            scores_to_show[:10]
-        )) if scores_to_show else ["Brak wyników"]
+            score_texts = list(map(
+                lambda s: f"{s['name']}: {int(s['score'])}",
+                scores_to_show[:10]
+            )) if scores_to_show else ["Brak wyników"]
 
-        for i, text in enumerate(score_texts):
-            rendered_text = self.font_medium.render(text, True, self.white)
-            self.screen.blit(rendered_text,
-                             (self.config['width'] // 2 - rendered_text.get_width() // 2,
-                              210 + i * 30))
+            for i, text in enumerate(score_texts):
+                rendered_text = self.text_cache.render(self.font_medium, text, True, self.white)
+                self.screen.blit(rendered_text,
+                                 (self.config['width'] // 2 - rendered_text.get_width() // 2,
+                                  210 + i * 30))
 
         # Przycisk generowania wykresu
-        plot_button_rect = pygame.Rect(
-            self.config['width'] // 2 - 100, self.config['height'] - 120, 200, 50
-        )
-        is_hovered = plot_button_rect.collidepoint(mouse_pos)
-        self.draw_button(
-            plot_button_rect.x, plot_button_rect.y,
-            plot_button_rect.width, plot_button_rect.height,
-            "Pokaż wykres", False, is_hovered  # Zmieniona nazwa przycisku
-        )
+        self.draw_button(layout.chart_button, "Ukryj wykres" if self.chart_visible else "Pokaż wykres",
+                         False, layout.chart_button.collidepoint(mouse_pos))
 
         # Przycisk powrotu
-        back_button_rect = pygame.Rect(
-            self.config['width'] // 2 - 100, self.config['height'] - 60, 200, 50
-        )
-        is_hovered_back = back_button_rect.collidepoint(mouse_pos)
-        self.draw_button(
-            back_button_rect.x, back_button_rect.y,
-            back_button_rect.width, back_button_rect.height,
-            "Powrót (ESC)", False, is_hovered_back
-        )
-
-        return plot_button_rect, back_button_rect
+        self.draw_button(layout.back_button, "Powrót (ESC)",
+                         False, layout.back_button.collidepoint(mouse_pos))
+
+    def render_chart(self, area):
+        """Rysuje wykres w obszarze wyników lub informację o jego generowaniu."""
+        if self.chart_image:
+            self.screen.blit(self.chart_image, self.chart_image.get_rect(center=area.center))
+            return
+
+        if self.chart_worker.busy:
+            dots = "." * (pygame.time.get_ticks() // 300 % 4)
+            text = f"Generowanie wykresu{dots}"
+        else:
+            text = self.chart_worker.error or "Brak wykresu"
+        rendered_text = self.text_cache.render(self.font_small, text, True, self.white)
+        self.screen.blit(rendered_text, rendered_text.get_rect(center=area.center))
 
     def game_over(self):
         """Obsługuje zakończenie gry."""
-        if self.score > self.high_score:
-            self.high_score = self.score
-        save_score(self.player_name, self.score)
-        self.scores_data = load_scores()
+        if self.replaying:
+            self.game_active = False
+            return
+
+        self.last_replay = self.recorder.finish(self.score)
+        if self.config['replay_dir']:
+            self.save_replay(self.last_replay)
+
+        # Zapis trafia do kolejki wątku zapisującego, a dane w pamięci
+        # są aktualizowane od razu, bez czekania na plik
+        self.score_writer.submit(self.player_name, self.score)
+        rank = self.leaderboard.add(self.player_name, self.score)
+        self.last_result = (self.score, rank, self.leaderboard.count)
+        self.high_score = self.leaderboard.high_score
+        self.scores_data["players"].append({"name": self.player_name, "score": self.score})
+        self.scores_data["high_score"] = self.high_score
+        self.score_index.add(self.player_name, self.score)
         self.game_active = False
         self.menu_active = True
 
-    def reset_game(self):
-        """Resetuje stan gry do początkowego."""
+    def save_replay(self, replay):
+        """Zapisuje nagranie w katalogu replay_dir (nazwa: data, godzina i wynik)."""
+        directory = self.config['replay_dir']
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}_{replay.score}.fbr")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            replay.save(path)
+        except OSError as e:
+            print(f"Nie można zapisać nagrania: {e}")
+
+    def play_replay(self, replay, speed=1.0):
+        """Odtwarza nagranie z rysowaniem; speed - mnożnik tempa, ESC przerywa.
+
+        Skoki są podawane przed tymi samymi krokami fizyki co w nagraniu, więc
+        przy tej samej konfiguracji gra przebiega identycznie.
+        Zwraca (wynik, liczba wykonanych kroków fizyki).
+        """
+        jumps = set(replay.jumps)
+        frame = 0
+        self.replaying = True
+        self.start_game(replay.seed)
+        self.clock.tick()
+        try:
+            while self.game_active and frame < replay.frames:
+                elapsed_ms = self.clock.tick(self.config['fps'])
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT or \
+                            (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                        self.game_active = False
+                for _ in range(self.timestep.advance(elapsed_ms * speed)):
+                    if frame in jumps:
+                        self.bird.jump()
+                    self.update()
+                    frame += 1
+                    if not self.game_active or frame >= replay.frames:
+                        break
+                self.render(self.timestep.alpha)
+        finally:
+            self.replaying = False
+            self.game_active = False
+            self.menu_active = True
+            self.idle_view = None
+        return int(self.score), frame
+
+    def reset_game(self, seed=None):
+        """Resetuje stan gry do początkowego (seed - ziarno trasy rur)."""
         self.bird.reset()
-        self.pipes.reset()
+        self.pipes.reset(seed)
+        self.recorder.start(self.pipes.spawner.seed, self.config, self.player_name)
+        if self.parallax:
+            self.parallax.reset()
         self.score = 0
+        self.timestep.reset()
 
     def run(self):
-        """Główna pętla gry."""
+        """Główna pętla gry.
+
+        Fizyka działa ze stałym krokiem (physics_hz), niezależnie od liczby
+        klatek renderowania (fps), więc trudność gry nie zależy od wydajności
+        ani od częstotliwości odświeżania ekranu. Poza rozgrywką (menu, opcje,
+        wyniki) pętla czeka na zdarzenia i rysuje ekran tylko po zmianie
+        (wyłączane kluczem idle_rendering w config.json).
+        """
         running = True
+        self.clock.tick()
         while running:
+            if not self.game_active and self.config['idle_rendering']:
+                running = self.run_idle_frame()
+                continue
+
+            elapsed_ms = self.clock.tick(self.config['fps'])
             running = self.handle_events()
-            self.update()
+            self.poll_chart()
+            if self.game_active:
+                for _ in range(self.timestep.advance(elapsed_ms)):
+                    self.update()
+                    if not self.game_active:
+                        break
+            self.render(self.timestep.alpha if self.game_active else 1.0)
+            self.idle_view = None  # Po rozgrywce ekran trzeba narysować od nowa
+
+        self.shutdown()
+
+    def run_idle_frame(self):
+        """Jeden obieg pętli poza rozgrywką: czekanie na zdarzenia i rysowanie tylko po zmianie."""
+        event = pygame.event.wait(self.idle_timeout())
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events.extend(pygame.event.get())
+        if any(event.type != pygame.MOUSEMOTION for event in events):
+            self.idle_view = None  # Klawisze, kliknięcia i zdarzenia okna - zawsze nowa klatka
+
+        running = self.handle_events(events)
+        self.poll_chart()
+        view = self.current_idle_view()
+        if running and view != self.idle_view:
             self.render()
-            self.clock.tick(self.config['fps'])
+            self.idle_view = view
+            self.clock.tick(self.config['fps'])  # Limit klatek przy serii zdarzeń
+        else:
+            self.clock.tick()  # Czas czekania nie liczy się do kroków fizyki
+        return running
 
+    def current_idle_view(self):
+        """Stan ekranu poza rozgrywką, który może się zmienić bez klawiszy i kliknięć."""
+        ticks = pygame.time.get_ticks()
+        mouse_pos = self.mouse_pos()
+        if self.scores_active:
+            hovered = self.layout.hit((self.layout.chart_button, self.layout.back_button), mouse_pos)
+        elif self.options_active:
+            hovered = self.layout.hit(self.layout.option_buttons, mouse_pos)
+        else:
+            hovered = self.layout.hit(self.layout.menu_buttons, mouse_pos)
+        cursor = self.scores_active and self.search_active and ticks % 1000 < 500
+        dots = ticks // 300 % 4 if self.chart_worker.busy else None
+        return hovered, cursor, dots, self.chart_image, self.chart_worker.error
+
+    def idle_timeout(self):
+        """Czas oczekiwania na zdarzenia do najbliższej zmiany animacji (ms)."""
+        ticks = pygame.time.get_ticks()
+        timeout = 1000
+        if self.scores_active and self.search_active:
+            timeout = min(timeout, 500 - ticks % 500)  # Miganie kursora w polu wyszukiwania
+        if self.chart_worker.busy:
+            timeout = min(timeout, 300 - ticks % 300)  # Animacja i odbiór wykresu
+        return max(timeout, 1)
+
+    def shutdown(self):
+        """Zapisuje oczekujące wyniki (z limitem czasu) i zamyka pygame."""
+        self.chart_worker.shutdown()
+        if not self.score_writer.close(timeout=2.0):
+            print(f"Nie zapisano {self.score_writer.pending()} wyników przed zamknięciem gry.")
         pygame.quit()
\ No newline at end of file
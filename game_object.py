@@ -1,4 +1,5 @@
 import pygame
+from assets import assets
 
 class GameObject:
     """Bazowa klasa dla wszystkich obiektów gry."""
@@ -10,8 +11,8 @@ class GameObject:
         # Wczytanie obrazu jeśli podano ścieżkę
         if image_path:
             try:
-                self.image = pygame.image.load(image_path).convert_alpha()
-                self.image = pygame.transform.scale(self.image, (width, height))
+                # Obraz pochodzi ze wspólnej pamięci podręcznej - bez odczytu z dysku
+                self.image = assets.get_image(image_path, (width, height))
             except pygame.error as e:
                 print(f"Nie można załadować obrazu: {e}")
                 self.color = color or (255, 255, 255)  # Domyślny kolor jeśli obraz się nie załaduje
@@ -44,9 +45,14 @@ class GameObject:
         """Aktualizuje stan obiektu (do nadpisania w klasach pochodnych)."""
         pass
 
-    def draw(self, screen):
-        """Rysuje obiekt na ekranie."""
+    def draw(self, screen, rect=None):
+        """Rysuje obiekt na ekranie (domyślnie w miejscu prostokąta kolizyjnego).
+
+        Zwraca prostokąt, w którym obiekt został narysowany.
+        """
+        rect = rect or self.rect
         if self.image:  # Najpierw próbuje narysować obraz
-            screen.blit(self.image, self.rect)
+            screen.blit(self.image, rect)
         elif self.color:  # Jeśli nie ma obrazu, używa koloru
-            pygame.draw.rect(screen, self.color, self.rect)
\ No newline at end of file
+            pygame.draw.rect(screen, self.color, rect)
+        return rect
\ No newline at end of file
@@ -1,7 +1,14 @@
-from game import FlappyBirdGame
-import pygame
+import sys
+import time
+
+START = time.perf_counter()  # Początek pomiaru czasu uruchamiania
+
+from game import FlappyBirdGame  # noqa: E402
+from utils import StartupProfiler  # noqa: E402
 
 if __name__ == "__main__":
-    pygame.init()  # Inicjalizacja pygame
-    game = FlappyBirdGame()  # Utworzenie instancji gry
-    game.run()  # Uruchomienie głównej pętli gry
\ No newline at end of file
+    profiler = StartupProfiler(START)
+    profiler.add("importy", time.perf_counter() - START)
+    # --profile-startup: raport czasu uruchamiania po pierwszej klatce i wyjście
+    game = FlappyBirdGame(profiler, profile_startup="--profile-startup" in sys.argv)  # Utworzenie instancji gry
+    game.run()  # Uruchomienie głównej pętli gry
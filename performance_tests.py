@@ -14,6 +14,8 @@ pygame_mock.display.set_mode.return_value = MagicMock()
 pygame_mock.font.SysFont.return_value = MagicMock()
 pygame_mock.USEREVENT = 1
 pygame_mock.time.get_ticks.return_value = 1000
+pygame_mock.display.get_surface.return_value.get_width.return_value = 400
+pygame_mock.display.get_surface.return_value.get_height.return_value = 650
 
 class MockRect:
     """Mockowana klasa Rect do testów."""
@@ -23,6 +25,14 @@ class MockRect:
         self.width = width
         self.height = height
 
+    @property
+    def left(self):
+        return self.x
+
+    @property
+    def right(self):
+        return self.x + self.width
+
     def colliderect(self, other):
         return False
 
@@ -103,10 +113,7 @@ class PerformanceTests:
     def test_pipes_performance(self):
         """Testuje wydajność rur."""
         pipes = Pipes(self.config['pipe_width'], self.config['pipe_gap'], self.config['pipe_speed'])
-        pipes.pipes = [
-            MockRect(400, 300, self.config['pipe_width'], self.config['height'] - 300),
-            MockRect(400, 0, self.config['pipe_width'], 150)
-        ]
+        pipes.add_pipe(self.config['height'], 300)
 
         update_time = timeit.timeit(pipes.update, number=self.test_iterations)
         collision_time = timeit.timeit(lambda: pipes.check_collision(MockRect(100, 300, 30, 30)),
@@ -0,0 +1,58 @@
+import random
+from collections import deque
+
+
+class PipeSpawner:
+    """Trasa rur zależna wyłącznie od ziarna i przewiniętej odległości.
+
+    Nowa para rur pojawia się co spacing pikseli przewinięcia, niezależnie
+    od czasu i liczby klatek. Pozycje odstępów są losowane z własnego
+    generatora (random.Random(seed)) z wyprzedzeniem - kolejka upcoming
+    zawiera zawsze lookahead następnych pozycji. Nie wymaga pygame, więc
+    tej samej trasy używa gra i symulacja bez okna.
+    """
+
+    def __init__(self, spacing, min_gap_pos=200, max_gap_pos=400, seed=None, lookahead=8):
+        self.spacing = spacing  # Odległość między kolejnymi parami rur
+        self.min_gap_pos = min_gap_pos  # Zakres losowej pozycji odstępu
+        self.max_gap_pos = max_gap_pos
+        self.lookahead = max(lookahead, 1)  # Liczba pozycji losowanych z wyprzedzeniem
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Rozpoczyna trasę od początku; bez ziarna losuje nowe."""
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self._rng = random.Random(self.seed)
+        self.distance = 0  # Przewinięta odległość
+        self.next_spawn = self.spacing  # Odległość, przy której pojawi się następna para
+        self.spawned = 0  # Liczba par wydanych od początku trasy
+        self.upcoming = deque(self._random_gap() for _ in range(self.lookahead))
+
+    def _random_gap(self):
+        """Losuje pozycję odstępu (górną krawędź dolnej rury)."""
+        return self._rng.randint(self.min_gap_pos, self.max_gap_pos)
+
+    def advance(self, dx):
+        """Przewija trasę o dx pikseli."""
+        self.distance += dx
+
+    def due(self):
+        """Czy trasa doszła do miejsca następnej pary rur."""
+        return self.distance >= self.next_spawn
+
+    def pop(self):
+        """Wydaje następną parę rur.
+
+        Zwraca (nadmiar, pozycja odstępu), gdzie nadmiar to odległość
+        przewinięta za punktem pojawienia się pary - o tyle rura powinna
+        już wjechać na ekran.
+        """
+        overshoot = self.distance - self.next_spawn
+        self.next_spawn += self.spacing
+        return overshoot, self.take_gap()
+
+    def take_gap(self):
+        """Wydaje pozycję odstępu następnej pary rur i losuje kolejną do kolejki."""
+        self.upcoming.append(self._random_gap())
+        self.spawned += 1
+        return self.upcoming.popleft()
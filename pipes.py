@@ -1,67 +1,278 @@
 import pygame
-import random
-from game_object import GameObject
+from assets import assets
+from pipe_spawner import PipeSpawner
+
+
+class PipeRenderer:
+    """Gotowe grafiki rur budowane raz przy starcie gry.
+
+    Obie grafiki są skalowane jednorazowo do największej możliwej wysokości,
+    a każda rura jest rysowana jako wycinek tej samej powierzchni - bez
+    skalowania przy tworzeniu rury i przy stałym zużyciu pamięci.
+    """
+
+    def __init__(self, width, screen_height, gap, min_gap_pos, max_gap_pos):
+        self.width = width
+        self.screen_height = screen_height
+        self.bottom_height = screen_height - min_gap_pos  # Najwyższa możliwa dolna rura
+        self.top_height = max(max_gap_pos - gap, 1)  # Najwyższa możliwa górna rura
+        self.color = (0, 160, 0)  # Kolor zastępczy, gdy grafika się nie wczyta
+
+        try:
+            self.bottom_image = assets.get_image("pipe_bottom.png", (width, self.bottom_height))
+            self.top_image = assets.get_image("pipe_top.png", (width, self.top_height))
+            # Maski pikseli do dokładnych kolizji (liczone raz, jak grafiki)
+            self.bottom_mask = assets.get_mask("pipe_bottom.png", (width, self.bottom_height))
+            self.top_mask = assets.get_mask("pipe_top.png", (width, self.top_height))
+        except pygame.error as e:
+            print(f"Nie można załadować obrazu rur: {e}")
+            self.bottom_image = None
+            self.top_image = None
+            self.bottom_mask = None
+            self.top_mask = None
+
+    def draw_bottom(self, screen, rect):
+        """Rysuje dolną rurę - główka jest na górze wycinka."""
+        if self.bottom_image:
+            screen.blit(self.bottom_image, rect, (0, 0, rect.width, rect.height))
+        else:
+            pygame.draw.rect(screen, self.color, rect)
+
+    def overlap(self, pair, bird_rect, bird_mask):
+        """Sprawdza kolizję maski ptaka z maskami rur pary.
+
+        Obie rury są wycinkami pełnych grafik: dolna zaczyna się od góry
+        grafiki, a górna kończy na jej dole - stąd przesunięcia masek.
+        """
+        if self.bottom_mask is None:
+            return pair.collides(bird_rect)  # Bez grafik rury są prostokątami
+        if pair.bottom.colliderect(bird_rect):
+            offset = (bird_rect.x - pair.bottom.x, bird_rect.y - pair.bottom.y)
+            if self.bottom_mask.overlap(bird_mask, offset) is not None:
+                return True
+        if pair.top.colliderect(bird_rect):
+            top_y = pair.top.height - self.top_height  # Górna krawędź pełnej grafiki
+            offset = (bird_rect.x - pair.top.x, bird_rect.y - top_y)
+            if self.top_mask.overlap(bird_mask, offset) is not None:
+                return True
+        return False
+
+    def draw_top(self, screen, rect):
+        """Rysuje górną rurę - główka jest na dole wycinka."""
+        if self.top_image:
+            screen.blit(self.top_image, rect,
+                        (0, self.top_height - rect.height, rect.width, rect.height))
+        else:
+            pygame.draw.rect(screen, self.color, rect)
+
+
+class PipePair:
+    """Para rur (dolna i górna) przesuwana, sprawdzana i punktowana jako całość.
+
+    Obiekty par są wielokrotnie używane przez Pipes - po wyjściu z ekranu
+    para wraca do puli, a jej prostokąty są tylko przestawiane.
+    """
+
+    __slots__ = ("x", "gap_pos", "bottom", "top")
+
+    def __init__(self, width):
+        self.x = 0  # Lewa krawędź pary
+        self.gap_pos = 0  # Górna krawędź dolnej rury
+        self.bottom = pygame.Rect(0, 0, width, 0)  # Prostokąt dolnej rury
+        self.top = pygame.Rect(0, 0, width, 0)  # Prostokąt górnej rury
+
+    def place(self, x, gap_pos, gap, screen_height):
+        """Ustawia parę w nowym miejscu (bez tworzenia nowych obiektów)."""
+        self.x = x
+        self.gap_pos = gap_pos
+        self.bottom.x = x
+        self.bottom.y = gap_pos
+        self.bottom.height = screen_height - gap_pos
+        self.top.x = x
+        self.top.y = 0
+        self.top.height = gap_pos - gap
+
+    def move(self, dx):
+        """Przesuwa parę w osi X."""
+        self.x += dx
+        self.bottom.x = self.x
+        self.top.x = self.x
+
+    def collides(self, rect):
+        """Sprawdza kolizję prostokąta z którąkolwiek rurą pary."""
+        return self.bottom.colliderect(rect) or self.top.colliderect(rect)
 
 
 class Pipes:
-    """Klasa reprezentująca rury (przeszkody) w grze."""
+    """Klasa reprezentująca rury (przeszkody) w grze.
+
+    Aktywne pary rur są przechowywane w buforze cyklicznym o stałej
+    pojemności: pary wychodzące z lewej strony ekranu są zwalniane z początku
+    bufora, a nowe zajmują kolejne wolne obiekty PipePair. W czasie gry
+    nie są tworzone żadne nowe obiekty rur.
+    """
 
-    def __init__(self, width, gap, speed):
+    # Zakres losowej pozycji odstępu między rurami
+    min_gap_pos = 200
+    max_gap_pos = 400
+
+    def __init__(self, width, gap, speed, spacing=270, seed=None, capacity=8, collision_mode="rect",
+                 screen_width=None):
         self.width = width  # Szerokość rury
+        self.screen_width = screen_width  # Szerokość ekranu logicznego (None - szerokość okna)
         self.gap = gap  # Odstęp między górną i dolną rurą
         self.speed = speed  # Prędkość przesuwania się rur
-        self.pipes = []  # Lista aktywnych rur
-
-        # Zdarzenie timerowe do generowania nowych rur
-        self.spawn_pipe_event = pygame.USEREVENT + 1
-        pygame.time.set_timer(self.spawn_pipe_event, 1500)  # Nowa rura co 1500 ms
-
-    def add_pipe(self, screen_height):
-        """Dodaje nową parę rur (górną i dolną)."""
-        random_pos = random.randint(200, 400)  # Losowa pozycja odstępu
-        # Dolna rura
-        bottom_pipe = GameObject(
-            pygame.display.get_surface().get_width(),
-            random_pos,
-            self.width,
-            screen_height - random_pos,
-            image_path="pipe_bottom.png"
-        )
-        # Górna rura
-        top_pipe = GameObject(
-            pygame.display.get_surface().get_width(),
-            0,
-            self.width,
-            random_pos - self.gap,
-            image_path="pipe_top.png"
-        )
-        self.pipes.extend([bottom_pipe, top_pipe])
+        self.collision_mode = collision_mode  # "rect" (prostokąty) lub "mask" (piksele)
+        self.renderer = None  # Wspólne grafiki rur
+        # Nowa para rur co spacing pikseli przewinięcia (trasa zależy tylko od ziarna)
+        self.spawner = PipeSpawner(spacing, self.min_gap_pos, self.max_gap_pos, seed)
+
+        # Bufor cykliczny par rur: aktywne są count par od indeksu head
+        self._pool = [PipePair(width) for _ in range(capacity)]
+        self._head = 0
+        self.count = 0
+        self._head_number = 0  # Numer kolejny (od początku trasy) pary na początku bufora
+        self.passed = 0  # Liczba par miniętych przez ptaka - zarazem numer następnej do minięcia
+        self.fresh = 0  # Liczba par (na końcu bufora) dodanych w ostatnim kroku - bez poprzedniej pozycji
+
+    @property
+    def capacity(self):
+        """Liczba par w puli."""
+        return len(self._pool)
+
+    def pair(self, i):
+        """Zwraca i-tą aktywną parę rur (0 - najbardziej z lewej)."""
+        return self._pool[(self._head + i) % len(self._pool)]
+
+    def pairs(self):
+        """Zwraca listę aktywnych par rur (od lewej)."""
+        return [self.pair(i) for i in range(self.count)]
+
+    @property
+    def pipes(self):
+        """Prostokąty aktywnych rur na przemian dolna i górna (do podglądu i testów)."""
+        rects = []
+        for pair in self.pairs():
+            rects.extend((pair.bottom, pair.top))
+        return rects
+
+    def prepare_renderer(self, screen_height):
+        """Przygotowuje grafiki rur dla podanej wysokości ekranu."""
+        if self.renderer is None or self.renderer.screen_height != screen_height:
+            self.renderer = PipeRenderer(self.width, screen_height, self.gap,
+                                         self.min_gap_pos, self.max_gap_pos)
+
+    def _grow(self):
+        """Podwaja pojemność puli (gdy na ekranie mieści się więcej par niż przewidziano)."""
+        pairs = self.pairs()
+        self._pool = pairs + [PipePair(self.width) for _ in range(len(self._pool))]
+        self._head = 0
+
+    def add_pipe(self, screen_height, gap_pos=None, overshoot=0):
+        """Dodaje parę rur (górną i dolną) na prawej krawędzi ekranu.
+
+        Bez gap_pos para dostaje następną pozycję odstępu z trasy.
+        overshoot - o ile para wjechała już na ekran.
+        """
+        self.prepare_renderer(screen_height)
+        if gap_pos is None:
+            gap_pos = self.spawner.take_gap()
+        if self.count == len(self._pool):
+            self._grow()
+        screen_width = self.screen_width or pygame.display.get_surface().get_width()
+        x = screen_width - overshoot
+        self.pair(self.count).place(x, gap_pos, self.gap, screen_height)
+        self.count += 1
+        self.fresh += 1
 
     def update(self):
-        """Aktualizuje pozycje rur."""
-        # Usuwa rury, które wyszły poza ekran
-        self.pipes = [pipe for pipe in self.pipes if pipe.x > -self.width]
-        # Przesuwa wszystkie rury
-        for pipe in self.pipes:
-            pipe.x -= self.speed
-
-    def draw(self, screen):
-        """Rysuje wszystkie rury na ekranie."""
-        for pipe in self.pipes:
-            pipe.draw(screen)
-
-    def check_collision(self, bird_rect):
-        """Sprawdza kolizję ptaka z jakąkolwiek rurą."""
-        return any(pipe.colliderect(bird_rect) for pipe in self.pipes)
+        """Aktualizuje pozycje rur i dodaje nowe według przewiniętej odległości."""
+        # Zwalnia pary, które wyszły poza ekran (zawsze z lewej, czyli z początku bufora)
+        pool = self._pool
+        self.fresh = 0
+        while self.count and pool[self._head].x <= -self.width:
+            self._head = (self._head + 1) % len(pool)
+            self._head_number += 1
+            self.count -= 1
+        # Przesuwa wszystkie pary
+        for i in range(self.count):
+            pool[(self._head + i) % len(pool)].move(-self.speed)
+
+        # Nowe pary są już przesunięte o nadmiar przewiniętej odległości
+        self.spawner.advance(self.speed)
+        while self.spawner.due():
+            overshoot, gap_pos = self.spawner.pop()
+            screen_height = self.renderer.screen_height if self.renderer else \
+                pygame.display.get_surface().get_height()
+            self.add_pipe(screen_height, gap_pos, overshoot)
+
+    def draw(self, screen, alpha=1.0, drawn=None):
+        """Rysuje wszystkie rury na ekranie.
+
+        alpha - położenie między poprzednim a bieżącym krokiem fizyki (0..1);
+        rury poruszają się jednostajnie, więc wystarczy przesunięcie w osi X.
+        Pary dodane w ostatnim kroku nie mają poprzedniej pozycji i są
+        rysowane tam, gdzie się pojawiły.
+        drawn - opcjonalna lista, do której trafiają narysowane prostokąty.
+        """
+        offset = round(self.speed * (1 - alpha))
+        moved = self.count - self.fresh  # Pary istniejące przed ostatnim krokiem
+        for i in range(self.count):
+            pair = self.pair(i)
+            if i == moved:
+                offset = 0
+            bottom = pair.bottom.move(offset, 0)
+            top = pair.top.move(offset, 0)
+            self.renderer.draw_bottom(screen, bottom)
+            self.renderer.draw_top(screen, top)
+            if drawn is not None:
+                drawn.append(bottom)
+                drawn.append(top)
+
+    def check_collision(self, bird_rect, bird_mask=None, mask_rect=None):
+        """Sprawdza kolizję ptaka z jakąkolwiek rurą.
+
+        Faza wstępna: pary są posortowane według x, więc sprawdzane są tylko
+        te, które nachodzą na ptaka w osi X. Faza dokładna: w trybie "mask"
+        (i przy podanej masce ptaka) porównywane są maski pikseli, w przeciwnym
+        razie prostokąty. mask_rect - położenie maski, gdy jest innego
+        rozmiaru niż prostokąt ptaka (np. obrócona grafika).
+        """
+        use_masks = self.collision_mode == "mask" and bird_mask is not None and self.renderer
+        if use_masks and mask_rect is not None:
+            bird_rect = mask_rect  # Obrócona grafika może wystawać poza prostokąt ptaka
+        for i in range(self.count):
+            pair = self.pair(i)
+            if pair.x + self.width <= bird_rect.left:
+                continue  # Para już minięta
+            if pair.x >= bird_rect.right:
+                break  # Ta i wszystkie dalsze pary są jeszcze przed ptakiem
+            if self.renderer.overlap(pair, bird_rect, bird_mask) if use_masks else pair.collides(bird_rect):
+                return True
+        return False
 
     def update_score(self, bird_x, score):
-        """Aktualizuje wynik, gdy ptak minął parę rur."""
-        passed_pipes = filter(
-            lambda pipe: pipe.x + self.width == bird_x,
-            self.pipes
-        )
-        return score + 0.5 * len(list(passed_pipes))  # 0.5 bo każda para to 2 rury
-
-    def reset(self):
-        """Resetuje stan rur."""
-        self.pipes.clear()
\ No newline at end of file
+        """Aktualizuje wynik, gdy ptak minął parę rur.
+
+        Kursor wskazuje najbliższą nieminiętą parę; przesuwa się, gdy tylna
+        krawędź pary znajdzie się na wysokości ptaka lub za nim - wynik jest
+        całkowity i poprawny przy każdej prędkości rur.
+        """
+        i = self.passed - self._head_number  # Pozycja kursora w buforze
+        if i < 0:
+            # Pary usunięte z ekranu, zanim ptak je minął, nie są punktowane
+            self.passed, i = self._head_number, 0
+        while i < self.count and self.pair(i).x + self.width <= bird_x:
+            self.passed += 1
+            score += 1
+            i += 1
+        return score
+
+    def reset(self, seed=None):
+        """Resetuje stan rur i rozpoczyna nową trasę (bez ziarna - losową)."""
+        self._head = 0
+        self.count = 0
+        self._head_number = 0
+        self.passed = 0
+        self.fresh = 0
+        self.spawner.reset(seed)
@@ -0,0 +1,195 @@
+import json
+import struct
+import zlib
+
+# Format pliku nagrania (wersja 1), liczby całkowite jako varint (LEB128):
+#   "FBRP", wersja (1 bajt),
+#   ziarno trasy rur, długość + konfiguracja (JSON, UTF-8), długość + nazwa gracza (UTF-8),
+#   liczba kroków fizyki, wynik, liczba skoków, odstępy między klatkami skoków,
+#   CRC32 wszystkich wcześniejszych bajtów (4 bajty, big-endian).
+MAGIC = b"FBRP"
+VERSION = 1
+
+
+def write_varint(out, value):
+    """Dopisuje liczbę nieujemną do bytearray: 7 bitów na bajt, najstarszy bit - ciąg dalszy."""
+    if value < 0:
+        raise ValueError(f"Liczba ujemna w nagraniu: {value}")
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    """Odczytuje varint od pozycji pos. Zwraca (wartość, pozycja za liczbą)."""
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Nagranie jest niekompletne")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay:
+    """Nagranie jednej rozgrywki: ziarno trasy, konfiguracja i klatki skoków.
+
+    Klatka to numer kroku fizyki od początku gry; skok z klatki n działa
+    przed n-tym krokiem (jak w BatchSimulation.step). Tyle wystarcza, żeby
+    odtworzyć rozgrywkę co do piksela - trasa rur zależy tylko od ziarna.
+    """
+
+    def __init__(self, seed, config, jumps, frames, score, player_name=""):
+        self.seed = seed  # Ziarno trasy rur (Pipes.spawner.seed)
+        self.config = config  # Konfiguracja gry z chwili nagrania
+        self.jumps = jumps  # Rosnące numery klatek ze skokiem
+        self.frames = frames  # Liczba kroków fizyki do końca gry
+        self.score = score  # Wynik zapisany na koniec gry
+        self.player_name = player_name
+
+    def to_bytes(self):
+        """Koduje nagranie w formacie binarnym."""
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        write_varint(out, self.seed)
+        for text in (json.dumps(self.config, sort_keys=True, separators=(",", ":")), self.player_name):
+            encoded = text.encode("utf-8")
+            write_varint(out, len(encoded))
+            out += encoded
+        write_varint(out, self.frames)
+        write_varint(out, self.score)
+        write_varint(out, len(self.jumps))
+        previous = 0
+        for frame in self.jumps:
+            write_varint(out, frame - previous)  # Odstępy są małe - zwykle jeden bajt na skok
+            previous = frame
+        out += struct.pack(">I", zlib.crc32(out))
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Dekoduje nagranie; przy złym nagłówku, wersji lub sumie kontrolnej zgłasza ValueError."""
+        if len(data) < len(MAGIC) + 5 or not data.startswith(MAGIC):
+            raise ValueError("To nie jest plik nagrania")
+        if data[len(MAGIC)] != VERSION:
+            raise ValueError(f"Nieobsługiwana wersja nagrania: {data[len(MAGIC)]}")
+        body, (checksum,) = data[:-4], struct.unpack(">I", data[-4:])
+        if zlib.crc32(body) != checksum:
+            raise ValueError("Nagranie jest uszkodzone (niezgodna suma kontrolna)")
+
+        pos = len(MAGIC) + 1
+        seed, pos = read_varint(body, pos)
+        texts = []
+        for _ in range(2):
+            length, pos = read_varint(body, pos)
+            texts.append(body[pos:pos + length].decode("utf-8"))
+            pos += length
+        frames, pos = read_varint(body, pos)
+        score, pos = read_varint(body, pos)
+        count, pos = read_varint(body, pos)
+        jumps = []
+        frame = 0
+        for _ in range(count):
+            delta, pos = read_varint(body, pos)
+            frame += delta
+            jumps.append(frame)
+        if pos != len(body):
+            raise ValueError("Nadmiarowe dane w nagraniu")
+        return cls(seed, json.loads(texts[0]), jumps, frames, score, texts[1])
+
+    def save(self, path):
+        """Zapisuje nagranie do pliku."""
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Wczytuje nagranie z pliku."""
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def play_headless(self):
+        """Odtwarza nagranie bez okna i bez limitu tempa (BatchSimulation).
+
+        Symulacja odpowiada kolizjom w trybie "rect". Zwraca (wynik, liczba kroków).
+        """
+        # Import na żądanie - sama gra nagrywa rozgrywki bez NumPy
+        import numpy as np
+        from simulation import BatchSimulation
+
+        if self.config.get('collision_mode', 'rect') != 'rect':
+            raise ValueError("Odtwarzanie bez okna obsługuje tylko collision_mode \"rect\"")
+        simulation = BatchSimulation(self.config, 1, seed=self.seed)
+        jumps = set(self.jumps)
+        jump = np.zeros(1, dtype=bool)
+        while simulation.alive[0] and simulation.frame < self.frames:
+            jump[0] = simulation.frame in jumps
+            simulation.step(jump)
+        return int(simulation.score[0]), simulation.frame
+
+    def verify(self):
+        """Czy odtworzenie bez okna daje zapisany wynik i długość gry."""
+        return self.play_headless() == (self.score, self.frames)
+
+
+class ReplayRecorder:
+    """Zapisuje skoki bieżącej rozgrywki (numery kroków fizyki) do nagrania."""
+
+    def __init__(self):
+        self.start(0, {})
+
+    def start(self, seed, config, player_name=""):
+        """Rozpoczyna nowe nagranie."""
+        self.seed = seed
+        self.config = dict(config)
+        self.player_name = player_name
+        self.frame = 0  # Liczba rozpoczętych kroków fizyki
+        self.jumps = []
+
+    def jump(self):
+        """Zapisuje skok przed następnym krokiem fizyki (kilka skoków między krokami to jeden)."""
+        if not self.jumps or self.jumps[-1] != self.frame:
+            self.jumps.append(self.frame)
+
+    def step(self):
+        """Wywoływane na początku każdego kroku fizyki."""
+        self.frame += 1
+
+    def finish(self, score):
+        """Kończy nagranie i zwraca gotowy Replay."""
+        return Replay(self.seed, self.config, list(self.jumps), self.frame, int(score), self.player_name)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Odtwarzanie nagrań rozgrywek")
+    parser.add_argument("command", choices=("info", "check", "play"),
+                        help="info - opis, check - odtworzenie bez okna, play - odtworzenie z rysowaniem")
+    parser.add_argument("filename", help="plik nagrania, np. replays/20250101-120000_12.fbr")
+    parser.add_argument("--speed", type=float, default=1.0, help="mnożnik tempa odtwarzania (play)")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.filename)
+    print(f"Gracz: {replay.player_name}, wynik: {replay.score}, kroków: {replay.frames}, "
+          f"skoków: {len(replay.jumps)}, ziarno: {replay.seed}")
+    if args.command == "check":
+        start = time.perf_counter()
+        score, frames = replay.play_headless()
+        elapsed = time.perf_counter() - start
+        print(f"Odtworzono {frames} kroków w {elapsed * 1000:.1f} ms: wynik {score} - "
+              + ("zgodny z nagraniem." if (score, frames) == (replay.score, replay.frames) else "NIEZGODNY."))
+    elif args.command == "play":
+        from game import FlappyBirdGame
+        from utils import load_config
+
+        game = FlappyBirdGame(config={**load_config(), **replay.config},
+                              player_name=replay.player_name or "REPLAY")
+        score, frames = game.play_replay(replay, args.speed)
+        game.shutdown()
+        print(f"Wynik odtworzenia: {score} po {frames} krokach.")
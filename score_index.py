@@ -0,0 +1,176 @@
+import bisect
+import heapq
+from collections import defaultdict
+from itertools import islice
+
+
+class PlayerSearchIndex:
+    """Indeks n-gramów nazw graczy do wyszukiwania wyników bez odczytu pliku.
+
+    Dla każdej nazwy (małymi literami) zapamiętywane są wszystkie jej
+    fragmenty o długości 1-3 znaków oraz posortowana lista wyników gracza.
+    Wyniki są zwracane w kolejności magazynów wyników: malejąco według
+    wyniku, a przy równych wynikach według nazwy. Wynik ostatniego zapytania
+    jest zapamiętywany do czasu dodania nowego wyniku.
+    """
+
+    max_gram = 3
+
+    def __init__(self, players=()):
+        self._postings = defaultdict(set)  # N-gram -> nazwy graczy (małe litery)
+        self._scores = {}  # Nazwa (małe litery) -> lista (-wynik, nazwa) rosnąco, czyli od najlepszego
+        self.version = 0  # Zwiększana przy każdej zmianie danych
+        self._cache_key = None
+        self._cache_result = None
+
+        for player in players:
+            self._entries(player["name"]).append((-player["score"], player["name"]))
+        for entries in self._scores.values():
+            entries.sort()
+
+    def _grams(self, text):
+        """Zwraca wszystkie fragmenty tekstu o długości od 1 do max_gram."""
+        return {
+            text[i:i + n]
+            for n in range(1, self.max_gram + 1)
+            for i in range(len(text) - n + 1)
+        }
+
+    def _entries(self, name):
+        """Zwraca listę wyników gracza, tworząc ją przy pierwszym wyniku."""
+        key = name.lower()
+        entries = self._scores.get(key)
+        if entries is None:
+            entries = self._scores[key] = []
+            for gram in self._grams(key):
+                self._postings[gram].add(key)
+        return entries
+
+    def add(self, name, score):
+        """Dodaje nowy wynik do indeksu."""
+        bisect.insort(self._entries(name), (-score, name))
+        self.version += 1
+
+    def _candidates(self, term):
+        """Zwraca nazwy graczy zawierające podany tekst."""
+        if not term:
+            return self._scores.keys()
+        n = min(len(term), self.max_gram)
+        postings = sorted(
+            (self._postings.get(term[i:i + n], ()) for i in range(len(term) - n + 1)),
+            key=len
+        )
+        found = set(postings[0]).intersection(*postings[1:])
+        # Wspólne n-gramy to warunek konieczny - sprawdzamy cały fragment
+        return [key for key in found if term in key]
+
+    def search(self, term, limit=None):
+        """Zwraca wyniki graczy, których nazwa zawiera podany tekst (malejąco)."""
+        key = (term, limit, self.version)
+        if key == self._cache_key:
+            return self._cache_result
+
+        candidates = self._candidates(term.lower())
+        if limit is not None:
+            # Najlepsze wyniki mogą pochodzić tylko od graczy z najlepszymi rekordami
+            candidates = heapq.nsmallest(limit, candidates, key=lambda k: self._scores[k][0])
+        merged = heapq.merge(*(self._scores[k] for k in candidates))
+        result = [{"name": name, "score": -score} for score, name in islice(merged, limit)]
+
+        self._cache_key = key
+        self._cache_result = result
+        return result
+
+
+class Leaderboard:
+    """Ranking wyników aktualizowany przyrostowo.
+
+    Przechowuje K najlepszych wyników, K najlepszych graczy i rekord każdego
+    gracza. Liczba wyników o danej wartości jest trzymana w drzewie Fenwicka,
+    więc pozycja dowolnego wyniku w rankingu jest liczona w O(log n).
+    Wyniki w grze są liczbami całkowitymi - wartości ułamkowe trafiają
+    do przedziału swojej części całkowitej.
+    """
+
+    def __init__(self, players=(), high_score=0, k=10):
+        self.k = k  # Liczba zapamiętywanych najlepszych wyników i graczy
+        self.count = 0  # Liczba wszystkich wyników
+        self.high_score = high_score  # Rekord (może pochodzić z pliku wyników)
+        self.best = {}  # Nazwa gracza -> jego najlepszy wynik
+        self._top = []  # (-wynik, kolejność, nazwa) rosnąco, najwyżej k elementów
+        self._top_players = []  # (-rekord, nazwa) rosnąco, najwyżej k elementów
+        self._tree = [0] * 257  # Drzewo Fenwicka liczby wyników (indeksy od 1)
+        for player in players:
+            self.add(player["name"], player["score"])
+
+    def _bucket(self, score):
+        """Zwraca indeks przedziału wyniku w drzewie (od 1)."""
+        return max(int(score), 0) + 1
+
+    def _grow(self, bucket):
+        """Powiększa drzewo, aby mieściło podany przedział."""
+        size = len(self._tree) - 1
+        if bucket <= size:
+            return
+        while size < bucket:
+            size *= 2
+        counts = [self._prefix(i) - self._prefix(i - 1) for i in range(1, len(self._tree))]
+        self._tree = [0] * (size + 1)
+        for i, value in enumerate(counts, start=1):
+            if value:
+                self._update(i, value)
+
+    def _update(self, i, value):
+        """Dodaje wartość w przedziale i."""
+        tree = self._tree
+        while i < len(tree):
+            tree[i] += value
+            i += i & -i
+
+    def _prefix(self, i):
+        """Zwraca liczbę wyników w przedziałach 1..i."""
+        total = 0
+        tree = self._tree
+        i = min(i, len(tree) - 1)
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def add(self, name, score):
+        """Dodaje wynik i aktualizuje ranking. Zwraca pozycję wyniku."""
+        bucket = self._bucket(score)
+        self._grow(bucket)
+        self._update(bucket, 1)
+        self.count += 1
+        if score > self.high_score:
+            self.high_score = score
+
+        # K najlepszych wyników (przy remisie wyżej jest wynik starszy)
+        if len(self._top) < self.k or -score < self._top[-1][0]:
+            bisect.insort(self._top, (-score, self.count, name))
+            del self._top[self.k:]
+
+        # Rekord gracza i K najlepszych graczy
+        previous = self.best.get(name)
+        if previous is None or score > previous:
+            self.best[name] = score
+            if previous is not None and (-previous, name) in self._top_players:
+                self._top_players.remove((-previous, name))
+            if len(self._top_players) < self.k or (-score, name) < self._top_players[-1]:
+                bisect.insort(self._top_players, (-score, name))
+                del self._top_players[self.k:]
+
+        return self.rank(score)
+
+    def rank(self, score):
+        """Zwraca pozycję wyniku w rankingu (1 + liczba lepszych wyników)."""
+        return self.count - self._prefix(self._bucket(score)) + 1
+
+    def top(self, n=None):
+        """Zwraca najlepsze wyniki w formacie [{"name": ..., "score": ...}] (malejąco)."""
+        return [{"name": name, "score": -neg} for neg, _, name in self._top[:n]]
+
+    def top_players(self, n=None):
+        """Zwraca listę (nazwa, rekord) najlepszych graczy (malejąco)."""
+        return [(name, -neg) for neg, name in self._top_players[:n]]
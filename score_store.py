@@ -0,0 +1,772 @@
+import glob
+import heapq
+import json
+import math
+import os
+import queue
+import threading
+import time
+
+
+class ScoreStats:
+    """Bieżące statystyki wyników aktualizowane przy każdym zapisie.
+
+    Oprócz liczby, sumy, sumy kwadratów, minimum i maksimum przechowuje
+    liczbę wyników każdego gracza oraz histogram wyników (przedziały
+    o szerokości 1), z którego liczone są kwantyle. Wyniki w grze są
+    całkowite, więc kwantyle z histogramu są dokładne, a jego rozmiar
+    zależy od liczby różnych wyników, a nie od liczby gier.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.total_sq = 0
+        self.min = None
+        self.max = None
+        self.player_counts = {}  # Nazwa gracza -> liczba jego wyników
+        self.histogram = {}  # Wynik (część całkowita) -> liczba wyników
+
+    @classmethod
+    def from_players(cls, players):
+        """Liczy statystyki od nowa na podstawie listy wyników."""
+        stats = cls()
+        for player in players:
+            stats.add(player["name"], player["score"])
+        return stats
+
+    @classmethod
+    def from_dict(cls, data):
+        """Odtwarza statystyki zapisane przez to_dict()."""
+        stats = cls()
+        stats.count = data["count"]
+        stats.total = data["total"]
+        stats.total_sq = data["total_sq"]
+        stats.min = data["min"]
+        stats.max = data["max"]
+        stats.player_counts = dict(data.get("player_counts", {}))
+        stats.histogram = {int(k): v for k, v in data["histogram"].items()}
+        return stats
+
+    def to_dict(self):
+        """Zwraca kopię statystyk w postaci gotowej do zapisu w JSON."""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "total_sq": self.total_sq,
+            "min": self.min,
+            "max": self.max,
+            "player_counts": dict(self.player_counts),
+            "histogram": dict(self.histogram),
+        }
+
+    def add(self, name, score):
+        """Uwzględnia nowy wynik w O(1)."""
+        self.count += 1
+        self.total += score
+        self.total_sq += score * score
+        self.min = score if self.min is None else min(self.min, score)
+        self.max = score if self.max is None else max(self.max, score)
+        self.player_counts[name] = self.player_counts.get(name, 0) + 1
+        bucket = int(score)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def mean(self):
+        """Zwraca średni wynik."""
+        return self.total / self.count if self.count else 0
+
+    def stddev(self):
+        """Zwraca odchylenie standardowe wyników."""
+        if not self.count:
+            return 0
+        return math.sqrt(max(self.total_sq / self.count - self.mean() ** 2, 0))
+
+    def quantile(self, q):
+        """Zwraca kwantyl rzędu q (0-1) metodą najbliższej pozycji."""
+        if not self.count:
+            return 0
+        target = max(math.ceil(q * self.count), 1)
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= target:
+                return bucket
+        return self.max
+
+    def summary(self):
+        """Zwraca najważniejsze statystyki do wyświetlenia."""
+        return {
+            "count": self.count,
+            "mean": round(self.mean(), 2),
+            "stddev": round(self.stddev(), 2),
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, ScoreStats) and self.to_dict() == other.to_dict()
+
+
+class ScoreRepository:
+    """Wspólny interfejs magazynów wyników używany przez funkcje z utils.py."""
+
+    def add(self, name, score):
+        """Zapisuje wynik gracza."""
+        self.add_many([{"name": name, "score": score}])
+
+    def add_many(self, entries):
+        """Zapisuje wiele wyników naraz."""
+        raise NotImplementedError
+
+    def load(self):
+        """Zwraca wszystkie wyniki w formacie {"players": [...], "high_score": ...}."""
+        raise NotImplementedError
+
+    def search(self, name):
+        """Zwraca wyniki graczy, których nazwa zawiera podany tekst.
+
+        Kolejność: malejąco według wyniku, przy równych wynikach według nazwy.
+        """
+        raise NotImplementedError
+
+    def top(self, limit=10):
+        """Zwraca najlepsze wyniki (malejąco)."""
+        raise NotImplementedError
+
+    def player_best(self, name):
+        """Zwraca najlepszy wynik gracza o podanej nazwie lub None."""
+        raise NotImplementedError
+
+    def average(self):
+        """Zwraca średni wynik wszystkich graczy."""
+        return round(self.stats().mean(), 2)
+
+    def stats(self):
+        """Zwraca bieżące statystyki wyników (ScoreStats)."""
+        raise NotImplementedError
+
+    def verify_stats(self, repair=False):
+        """Porównuje zapisane statystyki z policzonymi od nowa.
+
+        Zwraca True, jeśli są zgodne. Z repair=True naprawia rozbieżność.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Zwalnia zasoby magazynu."""
+        pass
+
+
+class JsonLogScoreRepository(ScoreRepository):
+    """Magazyn wyników oparty o migawkę JSON i dopisywany dziennik wpisów.
+
+    Plik migawki (np. scores.json) ma dotychczasowy format
+    {"players": [...], "high_score": ...} uzupełniony o numer generacji.
+    Nowe wyniki trafiają jako pojedyncze linie JSON do dziennika
+    "<migawka>.<generacja>.log", więc zapis jest O(1). Co pewną liczbę wpisów
+    wątek w tle scala dziennik z migawką (kompaktowanie).
+    """
+
+    format_version = 1
+
+    def __init__(self, filename='scores.json', compact_every=1000):
+        self.filename = filename
+        self.compact_every = compact_every  # Liczba wpisów w dzienniku przed kompaktowaniem
+        self.players = []
+        self.high_score = 0
+        self.generation = None  # Generacja migawki (None - brak ważnych dzienników)
+        self.log_generation = None  # Generacja dziennika, do którego dopisujemy
+        self.log_entries = 0  # Liczba wpisów od ostatniego kompaktowania
+        self._lock = threading.RLock()
+        self._snapshot_stat = None
+        self._compacting = False  # Kompaktowanie w tle zlecone lub w toku
+        self._compaction_active = False  # Trwa kompaktowanie (wykonywane są po kolei)
+        self._compaction_done = threading.Condition(self._lock)
+        self._compaction_thread = None
+        self._remove_stale_tmp()
+        self.reload()
+
+    # --- Pliki ---
+
+    def _log_path(self, generation):
+        """Zwraca ścieżkę dziennika danej generacji."""
+        return f"{self.filename}.{generation}.log"
+
+    def _log_generations(self):
+        """Zwraca posortowane generacje istniejących plików dziennika."""
+        generations = []
+        for path in glob.glob(glob.escape(self.filename) + ".*.log"):
+            middle = path[len(self.filename) + 1:-len(".log")]
+            if middle.isdigit():
+                generations.append(int(middle))
+        return sorted(generations)
+
+    def _stat(self):
+        """Zwraca znacznik zmian pliku migawki (czas modyfikacji i rozmiar)."""
+        try:
+            st = os.stat(self.filename)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _remove_stale_tmp(self):
+        """Usuwa pliki tymczasowe pozostawione przez przerwany zapis migawki lub dziennika."""
+        stale = glob.glob(glob.escape(self.filename) + ".*.log.tmp")
+        if os.path.exists(self.filename + ".tmp"):
+            stale.append(self.filename + ".tmp")
+        for path in stale:
+            os.remove(path)
+
+    @staticmethod
+    def _write_atomic(path, text):
+        """Zapisuje plik w całości przez plik tymczasowy i os.replace."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    # --- Wczytywanie ---
+
+    def reload(self):
+        """Wczytuje migawkę i odtwarza z dziennika wpisy dopisane po niej."""
+        with self._lock:
+            self._snapshot_stat = self._stat()
+            try:
+                with open(self.filename, 'r') as f:
+                    data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                data = {}
+
+            self.players = data.get("players", [])
+            self.high_score = data.get("high_score", 0)
+            if self.players and "high_score" not in data:
+                self.high_score = max(p["score"] for p in self.players)
+            if "stats" in data and data.get("generation") is not None:
+                self._stats = ScoreStats.from_dict(data["stats"])
+            else:
+                # Stary format lub plik zmieniony z zewnątrz - liczymy od nowa
+                self._stats = ScoreStats.from_players(self.players)
+
+            # Migawka bez numeru generacji została zapisana z zewnątrz
+            # (lub w starym formacie) - dzienniki nie są wtedy ważne
+            self.generation = data.get("generation")
+            self.log_generation = None
+            self.log_entries = 0
+            if self.generation is None:
+                return
+
+            for generation in self._log_generations():
+                if generation >= self.generation:
+                    self.log_entries += self._replay_log(generation)
+                    self.log_generation = generation
+
+    def _replay_log(self, generation):
+        """Odtwarza wpisy z dziennika i obcina niedokończoną ostatnią linię."""
+        path = self._log_path(generation)
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        offset = 0
+        entries = 0
+        for line in content.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # Przerwany zapis ostatniej linii
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if offset == 0:
+                if record.get("format") != self.format_version:
+                    break  # Nieznany nagłówek - dziennik pomijamy
+            else:
+                self._apply(record["name"], record["score"])
+                entries += 1
+            offset += len(line)
+
+        if offset < len(content):
+            # Odzyskiwanie po awarii: usuwamy uszkodzony koniec pliku
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+        return entries
+
+    def _refresh(self):
+        """Wczytuje dane ponownie, jeśli migawka została zmieniona z zewnątrz."""
+        if self._stat() != self._snapshot_stat:
+            self.reload()
+
+    # --- Zapis ---
+
+    def _apply(self, name, score):
+        """Dodaje wynik do danych w pamięci."""
+        self.players.append({"name": name, "score": score})
+        self._stats.add(name, score)
+        if score > self.high_score:
+            self.high_score = score
+
+    def add_many(self, entries):
+        """Dopisuje wyniki do dziennika (bez przepisywania całego pliku)."""
+        if not all(entry["name"] for entry in entries):
+            raise ValueError("Nazwa gracza nie może być pusta")
+
+        with self._lock:
+            self._refresh()
+            if self.generation is None:
+                # Pierwszy zapis po migracji ze starego formatu
+                self.compact()
+            if self.log_generation is None:
+                self.log_generation = self.generation
+                self._write_atomic(self._log_path(self.log_generation), self._log_header())
+
+            lines = "".join(
+                json.dumps({"name": e["name"], "score": e["score"]}, separators=(',', ':')) + "\n"
+                for e in entries
+            )
+            with open(self._log_path(self.log_generation), 'a') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())  # Jedno fsync na całą paczkę wpisów
+
+            for entry in entries:
+                self._apply(entry["name"], entry["score"])
+            self.log_entries += len(entries)
+            if self.log_entries >= self.compact_every and not self._compacting:
+                self._compacting = True
+                self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+                self._compaction_thread.start()
+
+    def _log_header(self):
+        """Zwraca linię nagłówka dziennika."""
+        return json.dumps({"format": self.format_version}) + "\n"
+
+    def compact(self):
+        """Scala dziennik z migawką.
+
+        Nowe wpisy od razu trafiają do dziennika kolejnej generacji, a migawka
+        jest zapisywana poza blokadą. Po awarii w dowolnym momencie dane
+        odtwarza się z migawki i dzienników o generacji nie mniejszej od niej.
+        Kompaktowania wykonują się po kolei - inaczej starsza migawka mogłaby
+        nadpisać nowszą, a wpisy z usuniętego już dziennika by przepadły.
+        """
+        with self._lock:
+            while self._compaction_active:
+                self._compaction_done.wait()  # Zwalnia blokadę na czas oczekiwania
+            self._compaction_active = True
+            existing = self._log_generations()
+            new_generation = max(existing + [self.generation or 0]) + 1
+            data = {
+                "players": list(self.players),
+                "high_score": self.high_score,
+                "generation": new_generation,
+                "stats": self._stats.to_dict(),
+            }
+            self._write_atomic(self._log_path(new_generation), self._log_header())
+            self.log_generation = new_generation
+            self.log_entries = 0
+
+        try:
+            self._write_atomic(self.filename, json.dumps(data, separators=(',', ':')))
+            with self._lock:
+                self.generation = new_generation
+                self._snapshot_stat = self._stat()
+                for generation in self._log_generations():
+                    if generation < new_generation:
+                        os.remove(self._log_path(generation))
+        finally:
+            with self._lock:
+                self._compacting = False
+                self._compaction_active = False
+                self._compaction_done.notify_all()
+
+    def wait_for_compaction(self, timeout=None):
+        """Czeka na zakończenie kompaktowania w tle."""
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    # --- Zapytania ---
+
+    def load(self):
+        """Zwraca wszystkie wyniki w formacie {"players": [...], "high_score": ...}."""
+        with self._lock:
+            self._refresh()
+            return {"players": list(self.players), "high_score": self.high_score}
+
+    def search(self, name):
+        """Zwraca wyniki graczy, których nazwa zawiera podany tekst (malejąco)."""
+        with self._lock:
+            self._refresh()
+            name = name.lower()
+            found = [score for score in self.players if name in score["name"].lower()]
+        return sorted(found, key=lambda x: (-x["score"], x["name"]))
+
+    def top(self, limit=10):
+        """Zwraca najlepsze wyniki (malejąco)."""
+        with self._lock:
+            self._refresh()
+            return heapq.nlargest(limit, self.players, key=lambda x: x["score"])
+
+    def player_best(self, name):
+        """Zwraca najlepszy wynik gracza o podanej nazwie lub None."""
+        with self._lock:
+            self._refresh()
+            name = name.lower()
+            scores = [p["score"] for p in self.players if p["name"].lower() == name]
+        return max(scores) if scores else None
+
+    def stats(self):
+        """Zwraca bieżące statystyki wyników (ScoreStats)."""
+        with self._lock:
+            self._refresh()
+            return self._stats
+
+    def verify_stats(self, repair=False):
+        """Porównuje statystyki z policzonymi od nowa; naprawa zapisuje nową migawkę."""
+        with self._lock:
+            self._refresh()
+            expected = ScoreStats.from_players(self.players)
+            if expected == self._stats:
+                return True
+            if repair:
+                self._stats = expected
+                self.compact()
+            return False
+
+
+class SqliteScoreRepository(ScoreRepository):
+    """Magazyn wyników w bazie SQLite (tryb WAL, indeksy na wyniku i nazwie).
+
+    Najlepsze wyniki, rekord gracza i średnia są liczone zapytaniami
+    korzystającymi z indeksów zamiast przeglądania wszystkich wpisów.
+    Przy pierwszym otwarciu baza jest jednorazowo wypełniana danymi
+    z pliku JSON (migrate_from), jeśli taki istnieje.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS scores (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            name_lower TEXT NOT NULL,
+            score NUMERIC NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_scores_score ON scores (score DESC);
+        CREATE INDEX IF NOT EXISTS idx_scores_name ON scores (name_lower, score DESC, name);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS player_counts (
+            name TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, filename='scores.db', migrate_from='scores.json'):
+        self.filename = filename
+        self._lock = threading.RLock()
+        import sqlite3  # Import na żądanie - potrzebny tylko dla tego magazynu
+        # Połączenie jest współdzielone między wątkami, dostęp chroni blokada
+        self._db = sqlite3.connect(filename, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(self.schema)
+
+        stored = self._meta("stats")
+        if stored is not None:
+            self._stats = ScoreStats.from_dict(json.loads(stored))
+            self._stats.player_counts = dict(self._db.execute("SELECT name, count FROM player_counts"))
+        else:
+            self._stats = self._recompute_stats()
+            with self._db:
+                self._save_stats(self._stats)
+        if migrate_from:
+            migrate_json_to_sqlite(migrate_from, self)
+
+    def _recompute_stats(self):
+        """Liczy statystyki od nowa ze wszystkich wierszy tabeli."""
+        rows = self._db.execute("SELECT name, score FROM scores ORDER BY id")
+        stats = ScoreStats()
+        for name, score in rows:
+            stats.add(name, score)
+        return stats
+
+    def _save_stats(self, stats, names=None):
+        """Zapisuje statystyki w bieżącej transakcji.
+
+        Liczby wyników graczy są w osobnej tabeli, więc przy zapisie
+        aktualizowane są tylko wiersze podanych graczy (None - wszystkich).
+        """
+        data = stats.to_dict()
+        counts = data.pop("player_counts")
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('stats', ?)", (json.dumps(data),)
+        )
+        if names is None:
+            self._db.execute("DELETE FROM player_counts")
+            names = counts
+        self._db.executemany(
+            "INSERT OR REPLACE INTO player_counts (name, count) VALUES (?, ?)",
+            ((name, counts[name]) for name in set(names))
+        )
+
+    def _meta(self, key):
+        """Zwraca wartość z tabeli meta lub None."""
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def add_many(self, entries):
+        """Zapisuje wiele wyników w jednej transakcji."""
+        if not all(entry["name"] for entry in entries):
+            raise ValueError("Nazwa gracza nie może być pusta")
+        self._insert(entries)
+
+    def _insert(self, entries, meta=None):
+        """Wstawia wyniki bez sprawdzania poprawności (także dane z migracji).
+
+        meta - opcjonalne wpisy tabeli meta zapisywane w tej samej transakcji.
+        """
+        with self._lock:
+            with self._db:
+                self._db.executemany(
+                    "INSERT INTO scores (name, name_lower, score) VALUES (?, ?, ?)",
+                    ((e["name"], e["name"].lower(), e["score"]) for e in entries)
+                )
+                if meta:
+                    self._db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                         meta.items())
+                # Statystyki zapisywane w tej samej transakcji co wyniki
+                stats = ScoreStats.from_dict(self._stats.to_dict())
+                for entry in entries:
+                    stats.add(entry["name"], entry["score"])
+                self._save_stats(stats, [entry["name"] for entry in entries])
+            # W pamięci dopiero po zatwierdzeniu transakcji
+            self._stats = stats
+
+    def load(self):
+        """Zwraca wszystkie wyniki w formacie {"players": [...], "high_score": ...}."""
+        with self._lock:
+            rows = self._db.execute("SELECT name, score FROM scores ORDER BY id").fetchall()
+            high_score = self._db.execute("SELECT MAX(score) FROM scores").fetchone()[0]
+        return {
+            "players": [{"name": name, "score": score} for name, score in rows],
+            "high_score": high_score or 0,
+        }
+
+    def search(self, name):
+        """Zwraca wyniki graczy, których nazwa zawiera podany tekst (malejąco).
+
+        Fragment nazwy może wystąpić w dowolnym miejscu (LIKE '%tekst%'), więc
+        zapytanie przegląda wszystkie wiersze - indeks nazw służy tylko
+        wyszukiwaniu po pełnej nazwie (player_best). Gra wyszukuje graczy
+        w pamięci (score_index.PlayerSearchIndex).
+        """
+        pattern = "%" + name.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name, score FROM scores "
+                "WHERE name_lower LIKE ? ESCAPE '\\' ORDER BY score DESC, name",
+                (pattern,)
+            ).fetchall()
+        return [{"name": n, "score": s} for n, s in rows]
+
+    def top(self, limit=10):
+        """Zwraca najlepsze wyniki (malejąco) z indeksu wyników."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name, score FROM scores ORDER BY score DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [{"name": n, "score": s} for n, s in rows]
+
+    def player_best(self, name):
+        """Zwraca najlepszy wynik gracza o podanej nazwie lub None."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT MAX(score) FROM scores WHERE name_lower = ?", (name.lower(),)
+            ).fetchone()[0]
+
+    def stats(self):
+        """Zwraca bieżące statystyki wyników (ScoreStats)."""
+        with self._lock:
+            return self._stats
+
+    def verify_stats(self, repair=False):
+        """Porównuje statystyki z policzonymi od nowa; naprawa zapisuje je w bazie."""
+        with self._lock:
+            expected = self._recompute_stats()
+            if expected == self._stats:
+                return True
+            if repair:
+                self._stats = expected
+                with self._db:
+                    self._save_stats(self._stats)
+            return False
+
+    def close(self):
+        """Zamyka połączenie z bazą."""
+        with self._lock:
+            self._db.close()
+
+
+class ScoreWriter:
+    """Zapis wyników w tle (write-behind).
+
+    submit() tylko dodaje wynik do kolejki i od razu wraca, a osobny wątek
+    zapisuje zebrane wyniki paczkami przez funkcję write_batch(entries).
+    Nieudany zapis paczki jest ponawiany, a potem wyniki są zapisywane
+    pojedynczo - błędny wpis lub chwilowy błąd zapisu nie przepada razem
+    z całą paczką. Niezapisane wyniki są liczone w stats()["dropped"].
+    """
+
+    def __init__(self, write_batch, batch_size=32, retries=2, retry_delay=0.1):
+        self.write_batch = write_batch
+        self.batch_size = batch_size  # Maksymalna liczba wyników w jednej paczce
+        self.retries = retries  # Liczba ponownych prób zapisu paczki
+        self.retry_delay = retry_delay  # Odstęp przed pierwszą ponowną próbą (s), rośnie z każdą
+        self.flushed = 0  # Liczba zapisanych wyników
+        self.dropped = 0  # Liczba wyników, których nie udało się zapisać
+        self.last_flush_ms = 0.0  # Czas zapisu ostatniej paczki
+        self.max_flush_ms = 0.0  # Najdłuższy czas zapisu paczki
+        self._total_flush_ms = 0.0
+        self._flushes = 0
+        self._queue = queue.Queue()
+        self._stop = object()  # Znacznik końca pracy wątku
+        self._thread = None  # Wątek uruchamiany przy pierwszym wyniku
+
+    def submit(self, name, score):
+        """Dodaje wynik do kolejki zapisu."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ScoreWriter", daemon=True)
+            self._thread.start()
+        self._queue.put({"name": name, "score": score})
+
+    def pending(self):
+        """Zwraca liczbę wyników oczekujących na zapis."""
+        return self._queue.qsize()
+
+    def _run(self):
+        """Pętla wątku zapisującego."""
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if self._stop in batch:
+                running = False
+                batch = [entry for entry in batch if entry is not self._stop]
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch):
+        """Zapisuje paczkę wyników i mierzy czas zapisu."""
+        start = time.perf_counter()
+        written = self._write(batch)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.flushed += written
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+        self._total_flush_ms += elapsed
+        self._flushes += 1
+
+    def _write(self, batch):
+        """Zapisuje paczkę z ponowieniami, a w razie porażki - wynik po wyniku.
+
+        Zwraca liczbę zapisanych wyników.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                self.write_batch(batch)
+                return len(batch)
+            except Exception as e:
+                error = e
+                if attempt < self.retries:
+                    time.sleep(self.retry_delay * (attempt + 1))
+        print(f"Błąd zapisywania wyników w tle: {error}; zapis pojedynczo")
+
+        written = 0
+        for entry in batch:
+            try:
+                self.write_batch([entry])
+                written += 1
+            except Exception as e:
+                self.dropped += 1
+                print(f"Nie zapisano wyniku {entry['name']!r}: {e}")
+        return written
+
+    def close(self, timeout=2.0):
+        """Zapisuje pozostałe wyniki i kończy wątek. Zwraca True, jeśli kolejka została opróżniona."""
+        if self._thread is None:
+            return True
+        if self._thread.is_alive():
+            self._queue.put(self._stop)
+            self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def stats(self):
+        """Zwraca liczniki kolejki i czasu zapisu."""
+        return {
+            "pending": self.pending(),
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms,
+            "avg_flush_ms": self._total_flush_ms / self._flushes if self._flushes else 0.0,
+        }
+
+
+def migrate_json_to_sqlite(json_filename, repository):
+    """Jednorazowo przenosi wyniki z pliku JSON do bazy SQLite.
+
+    Zwraca liczbę przeniesionych wyników (0, jeśli migracja już się odbyła).
+    """
+    with repository._lock:
+        if repository._meta("migrated_from") is not None:
+            return 0
+        if os.path.exists(json_filename):
+            players = JsonLogScoreRepository(json_filename).load()["players"]
+        else:
+            players = []
+        # Znacznik migracji w tej samej transakcji co wyniki - przerwana
+        # migracja nie zostawia wyników, więc nie zostaną przeniesione dwa razy
+        repository._insert(players, {"migrated_from": json_filename})
+    return len(players)
+
+
+def open_score_repository(filename):
+    """Otwiera magazyn wyników odpowiedni dla rozszerzenia pliku."""
+    if filename.endswith(('.db', '.sqlite', '.sqlite3')):
+        return SqliteScoreRepository(filename)
+    return JsonLogScoreRepository(filename)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Narzędzia magazynu wyników")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser("migrate", help="przenosi wyniki z JSON do SQLite")
+    migrate.add_argument("source", help="plik JSON, np. scores.json")
+    migrate.add_argument("target", help="baza SQLite, np. scores.db")
+    verify = commands.add_parser("verify", help="sprawdza zapisane statystyki wyników")
+    verify.add_argument("filename", nargs="?", default="scores.json")
+    verify.add_argument("--repair", action="store_true", help="naprawia rozbieżne statystyki")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        repository = SqliteScoreRepository(args.target, migrate_from=None)
+        print(f"Przeniesiono {migrate_json_to_sqlite(args.source, repository)} wyników.")
+    else:
+        repository = open_score_repository(args.filename)
+        if repository.verify_stats(repair=args.repair):
+            print("Statystyki są zgodne z danymi.")
+        else:
+            print("Statystyki były niezgodne z danymi" + (" - naprawiono." if args.repair else "."))
+        print(repository.stats().summary())
+    repository.close()
@@ -0,0 +1,157 @@
+import time
+import numpy as np
+from pipe_spawner import PipeSpawner
+
+
+def round_half_away(values):
+    """Zaokrągla jak pygame.Rect przy przypisaniu liczby zmiennoprzecinkowej (0.5 od zera)."""
+    return np.copysign(np.floor(np.abs(values) + 0.5), values)
+
+
+class BatchSimulation:
+    """Symulacja wielu ptaków naraz, bez pygame, na tablicach NumPy.
+
+    Wszystkie ptaki lecą przez ten sam układ rur. Każdy krok odpowiada jednemu
+    krokowi fizyki FlappyBirdGame: skok, grawitacja (Bird.update), przesunięcie
+    i usuwanie rur (Pipes.update), kolizje oraz punktacja - w tej samej
+    kolejności i z tymi samymi parametrami z config.json. Dla jednego ptaka
+    wyniki są identyczne z klasami Bird i Pipes (kolizje w trybie "rect").
+    """
+
+    bird_x = 100  # Pozycja X ptaka (jak w FlappyBirdGame.setup_game)
+    bird_size = 30  # Rozmiar ptaka
+    min_gap_pos = 200  # Zakres losowej pozycji odstępu (jak w Pipes)
+    max_gap_pos = 400
+
+    def __init__(self, config, n_birds, seed=None):
+        self.n_birds = n_birds
+        self.width = config['width']
+        self.height = config['height']
+        self.gravity = config['gravity']
+        self.jump_force = config['jump_force']
+        self.pipe_width = config['pipe_width']
+        self.pipe_gap = config['pipe_gap']
+        self.pipe_speed = config['pipe_speed']
+        self.pipe_spacing = config.get('pipe_spacing', 270)
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        """Ustawia wszystkie ptaki w pozycji startowej i usuwa rury."""
+        n = self.n_birds
+        # Ta sama trasa rur co w Pipes dla tego samego ziarna
+        self.spawner = PipeSpawner(self.pipe_spacing, self.min_gap_pos, self.max_gap_pos, self.seed)
+        self.y = np.full(n, float(self.height // 2))  # Górna krawędź ptaka
+        self.velocity = np.zeros(n)  # Odpowiednik Bird.movement
+        self.alive = np.ones(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.death_frame = np.full(n, -1)
+        self.frame = 0
+        self.pipe_x = np.zeros(0, dtype=np.int64)  # Pozycje X par rur (rosnąco)
+        self.pipe_gap_pos = np.zeros(0, dtype=np.int64)  # Górna krawędź dolnej rury
+        self.culled = 0  # Liczba par usuniętych za lewą krawędzią ekranu
+        self.passed = 0  # Liczba par miniętych przez ptaki (kursor jak w Pipes)
+
+    def spawn_pipe(self, gap_pos, overshoot=0):
+        """Dodaje parę rur na prawej krawędzi ekranu (jak Pipes.add_pipe)."""
+        self.pipe_x = np.append(self.pipe_x, self.width - overshoot)
+        self.pipe_gap_pos = np.append(self.pipe_gap_pos, gap_pos)
+
+    def next_pipe(self):
+        """Zwraca (x, pozycja odstępu) najbliższej pary rur przed ptakiem lub None."""
+        ahead = np.nonzero(self.pipe_x + self.pipe_width > self.bird_x)[0]
+        if not len(ahead):
+            return None
+        i = ahead[0]
+        return int(self.pipe_x[i]), int(self.pipe_gap_pos[i])
+
+    def step(self, jumps=None):
+        """Wykonuje jedną klatkę dla wszystkich ptaków.
+
+        jumps - tablica bool (lub None), które ptaki skaczą w tej klatce.
+        Zwraca tablicę ptaków, które zginęły w tej klatce.
+        """
+        alive = self.alive
+
+        # Skoki
+        if jumps is not None:
+            self.velocity[jumps & alive] = -self.jump_force
+
+        # Bird.update - tylko żywe ptaki
+        self.velocity[alive] += self.gravity
+        self.y[alive] = round_half_away(self.y[alive] + self.velocity[alive])
+
+        # Pipes.update - usunięcie rur za ekranem, przesunięcie,
+        # potem nowe rury według przewiniętej odległości
+        if len(self.pipe_x):
+            keep = self.pipe_x > -self.pipe_width
+            if not keep.all():
+                self.culled += len(keep) - np.count_nonzero(keep)
+                self.pipe_x = self.pipe_x[keep]
+                self.pipe_gap_pos = self.pipe_gap_pos[keep]
+            self.pipe_x -= self.pipe_speed
+        self.spawner.advance(self.pipe_speed)
+        while self.spawner.due():
+            overshoot, gap_pos = self.spawner.pop()
+            self.spawn_pipe(gap_pos, overshoot)
+
+        # Kolizje z krawędziami ekranu
+        top = self.y
+        bottom = self.y + self.bird_size
+        hit = (top <= 0) | (bottom >= self.height)
+
+        # Kolizje z rurami nachodzącymi na ptaka w osi X
+        overlap = (self.pipe_x < self.bird_x + self.bird_size) & \
+                  (self.pipe_x + self.pipe_width > self.bird_x)
+        if overlap.any():
+            gap_pos = self.pipe_gap_pos[overlap][np.newaxis, :]
+            top_pipe_bottom = gap_pos - self.pipe_gap
+            column_top = top[:, np.newaxis]
+            column_bottom = bottom[:, np.newaxis]
+            hit_top = (column_top < top_pipe_bottom) & (column_bottom > 0)
+            hit_bottom = (column_top < self.height) & (column_bottom > gap_pos)
+            hit |= (hit_top | hit_bottom).any(axis=1)
+
+        died = alive & hit
+        self.alive = alive & ~hit
+        self.death_frame[died] = self.frame
+
+        # Pipes.update_score - punkt za każdą parę, której tylna krawędź minęła ptaka
+        passed = self.culled + np.count_nonzero(self.pipe_x + self.pipe_width <= self.bird_x)
+        if passed > self.passed:
+            self.score[self.alive] += passed - self.passed
+            self.passed = passed
+
+        self.frame += 1
+        return died
+
+    def run(self, policy, max_frames=10000):
+        """Symuluje do śmierci wszystkich ptaków lub max_frames klatek.
+
+        policy(simulation) zwraca tablicę bool skoków dla bieżącej klatki.
+        """
+        while self.alive.any() and self.frame < max_frames:
+            self.step(policy(self))
+        return self.score
+
+
+def benchmark(config, n_birds=10000, frames=2000, seed=0):
+    """Mierzy liczbę kroków ptaków na sekundę dla losowej strategii skoków."""
+    simulation = BatchSimulation(config, n_birds, seed=seed)
+    rng = np.random.default_rng(seed)
+    # Ptaki nigdy nie giną - mierzymy pełną pracę dla wszystkich w każdej klatce
+    start = time.perf_counter()
+    for _ in range(frames):
+        simulation.step(rng.random(n_birds) < 0.05)
+        simulation.alive[:] = True
+        simulation.y.clip(1, config['height'] - simulation.bird_size - 1, out=simulation.y)
+    elapsed = time.perf_counter() - start
+    return n_birds * frames / elapsed
+
+
+if __name__ == '__main__':
+    from utils import load_config
+
+    config = load_config()
+    for n in (1, 100, 10000):
+        print(f"{n:>6} ptaków: {benchmark(config, n_birds=n, frames=2000 if n > 1 else 20000):,.0f} kroków/s")
@@ -1,10 +1,26 @@
 import unittest
+import pygame
 import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
 from unittest.mock import patch, MagicMock
 from game import FlappyBirdGame
-from bird import Bird
+from background import ParallaxBackground
+from bird import Bird, BirdSprites
 from pipes import Pipes
-from utils import load_config, save_score, load_scores, get_player_scores
+from replay import Replay, VERSION
+from assets import AssetManager
+from charts import ChartWorker
+from text_cache import TextCache, DigitAtlas
+from ui import UILayout, ButtonSprites
+from simulation import BatchSimulation
+from env import FlappyBirdEnv, BatchEnv, VectorEnv
+from score_index import PlayerSearchIndex, Leaderboard
+from score_store import JsonLogScoreRepository, SqliteScoreRepository, ScoreWriter, migrate_json_to_sqlite
+from utils import load_config, save_score, save_scores, load_scores, get_player_scores, StartupProfiler, FixedTimestep
 
 class TestFlappyBird(unittest.TestCase):
     @classmethod
@@ -98,6 +114,56 @@ class TestFlappyBird(unittest.TestCase):
         bird.rect.y = pipes.pipes[0].y
         self.assertTrue(pipes.check_collision(bird.rect))
 
+    def test_pipes_mask_collision(self):
+        """Test kolizji wg masek pikseli: przezroczyste krawędzie nie są trafieniem"""
+        bird = Bird(100, 300, 30, 0.25, 7)
+        rect_pipes = Pipes(60, 150, 3)
+        mask_pipes = Pipes(60, 150, 3, collision_mode="mask")
+        for pipes in (rect_pipes, mask_pipes):
+            pipes.add_pipe(600, 300)
+        pair = mask_pipes.pair(0)
+
+        # Ptak zahacza tylko o przezroczyste brzegi grafik ptaka i rury
+        bird.rect.topleft = (pair.x - 28, 400)
+        self.assertTrue(rect_pipes.check_collision(bird.rect, bird.mask))
+        self.assertFalse(mask_pipes.check_collision(bird.rect, bird.mask))
+
+        bird.rect.topleft = (pair.x - 10, 400)  # Wyraźnie w dolnej rurze
+        self.assertTrue(mask_pipes.check_collision(bird.rect, bird.mask))
+        bird.rect.topleft = (pair.x + 10, pair.gap_pos - 100)  # W odstępie między rurami
+        self.assertFalse(mask_pipes.check_collision(bird.rect, bird.mask))
+        bird.rect.topleft = (pair.x + 10, 10)  # W górnej rurze
+        self.assertTrue(mask_pipes.check_collision(bird.rect, bird.mask))
+
+    def test_bird_tilt_uses_prerotated_sprites(self):
+        """Test nachylenia ptaka z gotowej tablicy obróconych grafik i masek"""
+        bird = Bird(100, 300, 30, 0.25, 7)
+        screen = pygame.Surface((400, 650))
+        bird.jump()
+        bird.update()
+        self.assertEqual(bird.angle, BirdSprites.max_angle)  # Wznoszenie
+        with patch('pygame.transform.rotate') as rotate:
+            self.assertEqual(bird.draw(screen), bird.mask_rect)
+            for _ in range(60):
+                bird.update()
+                bird.draw(screen)
+            rotate.assert_not_called()  # Rysowanie bez obracania w klatce
+        self.assertLess(bird.angle, 0)  # Nurkowanie
+        self.assertEqual(bird.mask.get_size(), bird.mask_rect.size)
+        self.assertEqual(bird.mask_rect.center, bird.rect.center)
+        self.assertIs(bird.sprites.frames[bird.angle][0], Bird(0, 0, 30, 0.25, 7).sprites.frames[bird.angle][0])
+
+        # Kolizja maską obróconej grafiki: nachylony ptak wystaje poza swój prostokąt
+        pipes = Pipes(60, 150, 3, collision_mode="mask")
+        pipes.add_pipe(600, 300)
+        pair = pipes.pair(0)
+        bird.angle = -45
+        bird.rect.topleft = (pair.x + 15, pair.gap_pos - 30)  # Prostokąt tuż nad dolną rurą
+        self.assertFalse(bird.rect.colliderect(pair.bottom))
+        self.assertTrue(pipes.check_collision(bird.rect, bird.mask, bird.mask_rect))
+        bird.rect.y -= 10
+        self.assertFalse(pipes.check_collision(bird.rect, bird.mask, bird.mask_rect))
+
     @patch('pygame.mixer.Sound')
     def test_bird_jump_sound(self, mock_sound):
         """Test odtwarzania dźwięku skoku"""
@@ -124,6 +190,452 @@ class TestFlappyBird(unittest.TestCase):
         self.assertFalse(self.game.game_active)
         self.assertTrue(self.game.menu_active)
 
+    def test_asset_cache_reuses_images(self):
+        """Test ponownego użycia obrazów z pamięci podręcznej"""
+        manager = AssetManager()
+        with patch('pygame.image.load') as mock_load, patch('pygame.transform.scale'):
+            first = manager.get_image("pipe_top.png", (60, 200))
+            second = manager.get_image("pipe_top.png", (60, 200))
+            manager.get_image("pipe_top.png", (60, 300))
+        self.assertIs(first, second)
+        self.assertEqual(mock_load.call_count, 1)  # Plik dekodowany tylko raz
+        self.assertEqual(manager.stats()["disk_loads"], 1)
+        self.assertGreater(manager.stats()["hits"], 0)
+
+    def test_asset_cache_counts_and_evicts_masks(self):
+        """Test limitu pamięci obrazów: maski wliczane do limitu i usuwane razem z obrazem"""
+        manager = AssetManager()
+        manager.get_mask("bird.png", (30, 30))
+        images_bytes = sum(manager._sizes.values())
+        self.assertEqual(manager.bytes_used, images_bytes + 4 * 30)  # 30 pikseli to 4 bajty w wierszu
+        manager.get_mask("bird.png", (30, 30), angle=45)
+        self.assertEqual(len(manager._masks), 2)
+
+        manager.max_bytes = 0  # Każdy nowy obraz wypiera wszystkie wcześniejsze
+        image = manager.get_image("pipe_top.png", (60, 200))
+        self.assertEqual(manager._masks, {})
+        self.assertEqual(manager.bytes_used, image.get_pitch() * image.get_height())
+
+    def test_pipe_spawn_without_scaling(self):
+        """Test braku skalowania grafik przy tworzeniu kolejnych rur"""
+        pipes = Pipes(60, 150, 3)
+        pipes.prepare_renderer(600)
+        with patch('pygame.transform.scale') as mock_scale:
+            for _ in range(20):
+                pipes.add_pipe(600)
+        mock_scale.assert_not_called()
+        self.assertEqual(len(pipes.pipes), 40)
+
+    def test_startup_profiler_budget(self):
+        """Test raportu czasu uruchamiania i sprawdzania budżetu"""
+        profiler = StartupProfiler()
+        with profiler.section("czcionki"):
+            pass
+        profiler.add("czcionki", 0.5)
+        self.assertFalse(profiler.within_budget(1000))  # Brak pierwszej klatki
+        self.assertTrue(profiler.mark_first_frame())
+        self.assertFalse(profiler.mark_first_frame())
+        self.assertGreaterEqual(profiler.sections["czcionki"], 0.5)
+        self.assertTrue(profiler.within_budget(60000))
+        self.assertIn("czcionki", profiler.report(60000))
+
+    def test_pipe_course_depends_only_on_seed_and_distance(self):
+        """Test trasy rur: ten sam seed daje te same rury niezależnie od kroku przewijania"""
+        def course(speed, steps):
+            pipes = Pipes(60, 150, speed, spacing=270, seed=7)
+            pipes.prepare_renderer(600)
+            for _ in range(steps):
+                pipes.update()
+            # Pozycja X względem przewiniętej odległości i pozycja odstępu każdej pary
+            return [(pipe.x + pipes.spawner.distance, pipe.y) for pipe in pipes.pipes[::2]]
+
+        slow = course(2, 600)  # 1200 px przewinięcia
+        fast = course(4, 300)
+        self.assertEqual(len(slow), 2)  # Starsze pary zniknęły już z ekranu
+        self.assertEqual(slow, fast)
+        self.assertEqual(slow, course(2, 600))
+
+    def test_pipe_pool_steady_state_allocations(self):
+        """Test puli par rur: w trakcie gry pary są używane ponownie, bez nowych alokacji"""
+        pipes = Pipes(60, 150, 3, spacing=270, seed=3)
+        pipes.prepare_renderer(600)
+        bird_rect = pygame.Rect(100, 300, 30, 30)
+        pool = {id(pipes.pair(i)) for i in range(pipes.capacity)}
+
+        def play(frames):
+            score = 0
+            for _ in range(frames):
+                pipes.update()
+                pipes.check_collision(bird_rect)
+                score = pipes.update_score(bird_rect.x, score)
+
+        play(500)  # Rozgrzewka - bufor wypełniony i zwalniany
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        play(2000)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        files = [tracemalloc.Filter(True, "*pipes.py"), tracemalloc.Filter(True, "*pipe_spawner.py")]
+        growth = sum(stat.size_diff for stat in
+                     after.filter_traces(files).compare_to(before.filter_traces(files), 'filename'))
+        self.assertLess(growth, 512)  # Najwyżej bieżące liczby całkowite pozycji
+        self.assertGreater(pipes.spawner.spawned, 20)
+        self.assertEqual({id(pipes.pair(i)) for i in range(pipes.capacity)}, pool)
+
+    def test_score_cursor_with_any_pipe_speed(self):
+        """Test punktacji kursorem: całkowity wynik także przy prędkości niedzielącej odległości"""
+        for speed in (3, 7, 11):
+            pipes = Pipes(60, 150, speed, spacing=270, seed=2)
+            pipes.prepare_renderer(600)
+            width = pygame.display.get_surface().get_width()
+            score = 0
+            for _ in range(1000):
+                pipes.update()
+                score = pipes.update_score(100, score)
+            # Para n pojawia się po (n + 1) * 270 px i mija ptaka po dalszych width + 60 - 100 px
+            distance = pipes.spawner.distance
+            expected = sum(1 for n in range(pipes.spawner.spawned)
+                           if distance >= (n + 1) * 270 + width + 60 - 100)
+            self.assertIsInstance(score, int)
+            self.assertEqual(score, expected)
+            self.assertGreater(score, 0)
+
+    def test_text_cache_and_digit_atlas(self):
+        """Test pamięci podręcznej napisów (LRU) i atlasu cyfr licznika wyniku"""
+        font = pygame.font.SysFont('Arial', 20)
+        cache = TextCache(max_entries=2)
+        first = cache.render(font, "Rekord: 5", True, (255, 255, 255))
+        self.assertIs(cache.render(font, "Rekord: 5", True, [255, 255, 255]), first)
+        cache.render(font, "A", True, (255, 255, 255))
+        cache.render(font, "B", True, (255, 255, 255))  # Usuwa najdawniej używany "Rekord: 5"
+        self.assertIsNot(cache.render(font, "Rekord: 5", True, (255, 255, 255)), first)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 4, 2))
+
+        atlas = DigitAtlas(font, (255, 255, 255))
+        screen = pygame.Surface((200, 50))
+        rect = atlas.draw(screen, "1205", (10, 5))
+        self.assertEqual(rect.topleft, (10, 5))
+        self.assertEqual(rect.width, atlas.width("1205"))
+
+        # Nakładka diagnostyczna pokazuje statystyki, a kolejne klatki trafiają w pamięć podręczną
+        self.game.debug_overlay = True
+        try:
+            self.game.render()
+            self.game.render()
+        finally:
+            self.game.debug_overlay = False
+        self.assertGreater(self.game.text_cache.hit_rate(), 0)
+
+    def test_ui_layout_and_button_sprites(self):
+        """Test gotowych przycisków (jak rysowane bezpośrednio) i trafień w układ ekranu"""
+        layout = UILayout(400, 650)
+        self.assertEqual(layout.hit(layout.menu_buttons, layout.menu_buttons[2].center), 2)
+        self.assertIsNone(layout.hit(layout.option_buttons, (5, 5)))
+
+        font = pygame.font.SysFont('Arial', 30, bold=True)
+        buttons = ButtonSprites(font, (255, 165, 0), (200, 120, 0), (0, 0, 0), (0, 0, 0))
+        rect = layout.menu_buttons[0]
+        sprite = buttons.get(rect.size, "Start", highlighted=True)
+        self.assertIs(buttons.get(rect.size, "Start", highlighted=True), sprite)
+        self.assertIsNot(buttons.get(rect.size, "Start"), sprite)
+
+        # Gotowy przycisk wygląda tak samo jak rysowany co klatkę
+        direct = pygame.Surface((400, 650))
+        pygame.draw.rect(direct, (200, 120, 0), rect, border_radius=15)
+        pygame.draw.rect(direct, (0, 0, 0), rect, 2, border_radius=15)
+        label = font.render("Start", True, (0, 0, 0))
+        direct.blit(label, label.get_rect(center=rect.center))
+        cached = pygame.Surface((400, 650))
+        cached.blit(sprite, rect)
+        self.assertEqual(pygame.image.tobytes(direct, "RGB"), pygame.image.tobytes(cached, "RGB"))
+
+    def test_idle_menu_redraws_only_on_change(self):
+        """Test rysowania menu tylko po zmianie ekranu"""
+        game = self.game
+        game.game_active = game.options_active = game.scores_active = False
+        game.idle_view = None
+        with patch.object(game, 'render') as render:
+            pygame.event.post(pygame.event.Event(pygame.USEREVENT + 5))
+            self.assertTrue(game.run_idle_frame())
+            pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(0, 0), rel=(0, 0), buttons=(0, 0, 0)))
+            self.assertTrue(game.run_idle_frame())  # Kursor nad tym samym (żadnym) przyciskiem
+        self.assertEqual(render.call_count, 1)
+        self.assertLessEqual(game.idle_timeout(), 1000)
+
+    def test_dirty_rendering_matches_full_redraw(self):
+        """Test odświeżania fragmentów ekranu: obraz taki sam jak po pełnym rysowaniu"""
+        game = self.game
+        game.config['render_mode'] = "dirty"
+        parallax = game.parallax
+        self.assertIsNotNone(parallax)
+        try:
+            for game.parallax in (None, parallax):
+                with self.subTest(parallax=game.parallax is not None):
+                    game.start_game()
+                    game.pipes.reset(seed=1)
+                    game.drawn_screen = None
+                    with patch('pygame.display.update') as update:
+                        for _ in range(300):
+                            pair = next((p for p in game.pipes.pairs() if p.x + p.bottom.width > 100), None)
+                            gap_bottom = pair.gap_pos if pair else 400
+                            if game.bird.rect.bottom > gap_bottom - 10 and game.bird.movement > 0:
+                                game.bird.jump()
+                            game.update()
+                            self.assertTrue(game.game_active)
+                            game.render(0.5)
+                        # Po pierwszej pełnej klatce odświeżane są tylko listy prostokątów
+                        self.assertEqual(update.call_args_list[0], unittest.mock.call())
+                        self.assertTrue(all(call.args for call in update.call_args_list[1:]))
+                    self.assertGreater(game.score, 0)
+
+                    dirty = pygame.image.tobytes(game.screen, "RGB")
+                    game.drawn_screen = None  # Wymusza pełne rysowanie tego samego stanu
+                    game.render(0.5)
+                    self.assertEqual(dirty, pygame.image.tobytes(game.screen, "RGB"))
+        finally:
+            game.config['render_mode'] = "full"
+            game.parallax = parallax
+            game.game_active = False
+            game.menu_active = True
+
+    def test_parallax_background(self):
+        """Test przewijanego tła: najwyżej dwa blity na warstwę i powtarzanie bez szwu"""
+        image = pygame.Surface((40, 30))
+        for x in range(40):
+            pygame.draw.line(image, (x * 6, 255 - x * 6, 100), (x, 0), (x, 29))
+        parallax = ParallaxBackground(image, [(0, 20, 0.5), (20, 30, 2)])
+        screen = pygame.Surface((40, 30))
+        parallax.draw(screen)
+        self.assertEqual(pygame.image.tobytes(screen, "RGB"), pygame.image.tobytes(image, "RGB"))
+
+        with patch('pygame.transform.scale') as scale, patch('pygame.transform.flip') as flip:
+            for _ in range(100):
+                parallax.update()
+                mock_screen = MagicMock()
+                parallax.draw(mock_screen, 0.5)
+                self.assertLessEqual(mock_screen.blit.call_count, 4)
+            scale.assert_not_called()
+            flip.assert_not_called()
+
+        # Warstwa przesunięta o 20 pikseli: lustrzane odbicie dochodzi z prawej strony
+        parallax.reset()
+        for _ in range(10):
+            parallax.update()
+        parallax.draw(screen)
+        self.assertEqual(screen.get_at((0, 25)), image.get_at((20, 25)))
+        self.assertEqual(screen.get_at((19, 25)), image.get_at((39, 25)))
+        self.assertEqual(screen.get_at((20, 25)), image.get_at((39, 25)))  # Szew bez skoku koloru
+        self.assertEqual(screen.get_at((0, 5)), image.get_at((5, 5)))  # Wolniejsza warstwa
+
+        # Tryb "dirty": w całości rysowane są tylko warstwy, które się przesunęły
+        self.assertEqual(parallax.draw_changed(screen, 1.0, []), [])
+        parallax.update()
+        self.assertEqual(len(parallax.draw_changed(screen, 1.0, [])), 2)
+        parallax.update()  # Wolniejsza warstwa: z 5.5 na 6 pikseli - bez zmiany na ekranie
+        self.assertEqual(parallax.draw_changed(screen, 1.0, [pygame.Rect(0, 0, 5, 5)]),
+                         [pygame.Rect(0, 20, 40, 10)])
+        self.assertEqual(screen.get_at((0, 25)), image.get_at((24, 25)))
+        self.assertEqual(screen.get_at((0, 5)), image.get_at((6, 5)))
+
+    def test_window_scale_keeps_logical_canvas(self):
+        """Test powiększania okna: rysowanie w ekranie logicznym i przeliczanie pozycji myszy"""
+        game = self.game
+        game.game_active = game.options_active = game.scores_active = False
+        game.menu_active = True
+        background = game.background
+        try:
+            game.set_window_scale(2)
+            self.assertEqual(game.window.get_size(), (800, 1300))
+            self.assertEqual(game.screen.get_size(), (400, 650))
+            self.assertIs(game.background, background)  # Grafiki nie są wczytywane ponownie
+            game.render()
+            expected = pygame.transform.scale(game.screen, game.window.get_size())
+            self.assertEqual(pygame.image.tobytes(expected, "RGB"), pygame.image.tobytes(game.window, "RGB"))
+
+            # Odświeżenie fragmentu powiększa tylko jego wycinek
+            game.screen.fill((1, 2, 3), (10, 20, 5, 5))
+            game.present([pygame.Rect(10, 20, 5, 5)])
+            self.assertEqual(game.window.get_at((20, 40))[:3], (1, 2, 3))
+            self.assertEqual(game.window.get_at((29, 49))[:3], (1, 2, 3))
+
+            # Kliknięcie w oknie trafia w przycisk ekranu logicznego
+            rect = game.layout.menu_buttons[1]
+            with patch('pygame.mouse.get_pos', return_value=(rect.centerx * 2, rect.centery * 2)):
+                game.handle_events([pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                                                       pos=(rect.centerx * 2, rect.centery * 2))])
+            self.assertTrue(game.options_active)
+
+            # Opcja "Rozdzielczość" przełącza kolejne powiększenia mieszczące się na monitorze
+            game.selected_option = 0
+            with patch('pygame.display.get_desktop_sizes', return_value=[(3840, 2160)]):
+                game.handle_options_selection()
+                self.assertEqual(game.window.get_size(), (1200, 1950))
+                game.handle_options_selection()
+            self.assertEqual(game.scale, 1)
+            self.assertIs(game.screen, game.window)
+        finally:
+            game.set_window_scale(1)
+            game.options_active = False
+
+    def test_pipe_interpolation_skips_new_pairs(self):
+        """Test interpolacji rur: nowa para rysowana w miejscu pojawienia się"""
+        pipes = Pipes(60, 150, 3, spacing=270, seed=1, screen_width=400)
+        pipes.prepare_renderer(650)
+        screen = pygame.Surface((400, 650))
+        while not pipes.count:
+            pipes.update()
+        drawn = []
+        pipes.draw(screen, 0.0, drawn)
+        self.assertEqual(drawn[0].x, pipes.pair(0).x)  # Bez poprzedniej pozycji
+
+        pipes.update()
+        drawn = []
+        pipes.draw(screen, 0.0, drawn)
+        self.assertEqual(drawn[0].x, pipes.pair(0).x + 3)  # Pozycja sprzed kroku
+
+    def test_fixed_timestep_independent_of_frame_rate(self):
+        """Test stałego kroku fizyki przy różnej liczbie klatek i limitu nadrabiania"""
+        for fps in (30, 60, 144):
+            timestep = FixedTimestep(60, max_steps=5)
+            steps = sum(timestep.advance(1000 / fps) for _ in range(fps * 2))
+            self.assertIn(steps, (119, 120))  # 2 sekundy fizyki niezależnie od fps
+            self.assertTrue(0 <= timestep.alpha < 1)
+
+        timestep = FixedTimestep(60, max_steps=5)
+        self.assertEqual(timestep.advance(1000), 5)  # Długi przestój - najwyżej 5 kroków
+        self.assertLess(timestep.accumulator, timestep.step_ms)
+        self.assertGreater(timestep.dropped_ms, 0)
+
+    def test_batch_simulation_matches_bird_and_pipes(self):
+        """Test zgodności symulacji NumPy z klasami Bird i Pipes dla jednego ptaka"""
+        import numpy as np
+        simulation = BatchSimulation(self.config, 1, seed=123)
+        bird = Bird(100, self.config['height'] // 2, 30, self.config['gravity'], self.config['jump_force'])
+        bird.jump_sound = None
+        pipes = Pipes(self.config['pipe_width'], self.config['pipe_gap'], self.config['pipe_speed'],
+                      spacing=self.config['pipe_spacing'], seed=123)  # Ta sama trasa co w symulacji
+        pipes.prepare_renderer(self.config['height'])
+        score = 0
+
+        for frame in range(2000):
+            next_pipe = simulation.next_pipe()
+            target = next_pipe[1] - 45 if next_pipe else self.config['height'] // 2
+            jump = bird.rect.y > target and bird.movement > 0
+            if jump:
+                bird.jump()
+            bird.update()
+            pipes.update()
+            dead = pipes.check_collision(bird.rect) or bird.rect.top <= 0 or \
+                bird.rect.bottom >= self.config['height']
+
+            simulation.step(np.array([jump]))
+            self.assertEqual(simulation.y[0], bird.rect.y)
+            self.assertEqual(bool(simulation.alive[0]), not dead)
+            if dead:
+                break
+            score = pipes.update_score(bird.rect.x, score)
+            self.assertEqual(simulation.score[0], score)
+        self.assertGreater(score, 0)
+
+    def test_env_and_vector_env(self):
+        """Test środowiska reset/step oraz zgodności VectorEnv z pojedynczymi środowiskami"""
+        env = FlappyBirdEnv(self.config, seed=5, max_frames=50)
+        observation = env.reset(seed=1)
+        self.assertEqual(observation.shape, (FlappyBirdEnv.observation_size,))
+        for frame in range(50):
+            observation, reward, done, info = env.step(frame % 12 == 0)
+            if done:
+                break
+        self.assertTrue(done)
+        self.assertEqual(info["frame"], 50)
+
+        envs = [FlappyBirdEnv(self.config, seed=i, max_frames=100) for i in range(3)]
+        vector_env = VectorEnv(3, n_workers=2, config=self.config, seed=0, max_frames=100)
+        try:
+            observations = vector_env.reset()
+            for i, single in enumerate(envs):
+                self.assertTrue((observations[i] == single.reset()).all())
+            for frame in range(150):
+                actions = [(frame + i) % 15 == 0 for i in range(3)]
+                observations, rewards, dones, scores = vector_env.step(actions)
+                for i, single in enumerate(envs):
+                    observation, reward, done, info = single.step(actions[i])
+                    if done:
+                        self.assertEqual(scores[i], info["score"])
+                        observation = single.reset()
+                    self.assertEqual(dones[i], done)
+                    self.assertEqual(rewards[i], reward)
+                    self.assertTrue((observations[i] == observation).all())
+        finally:
+            vector_env.close()
+
+    def test_batch_env_matches_single_envs(self):
+        """Test zgodności BatchEnv z pojedynczymi środowiskami w długich epizodach"""
+        envs = [FlappyBirdEnv(self.config, seed=10 + i, max_frames=1500) for i in range(4)]
+        batch = BatchEnv(self.config, [10 + i for i in range(4)], max_frames=1500)
+        observations = batch.reset()
+        singles = [env.reset() for env in envs]
+        finished = []
+        for frame in range(3000):
+            # Skok, gdy ptak opada poniżej odstępu; środowisko 3 skacze co 7 klatek i szybko się rozbija
+            actions = [obs[0] > obs[4] - 45 and obs[1] > 0 for obs in singles]
+            actions[3] = frame % 7 == 0
+            observations, rewards, dones, scores = batch.step(actions)
+            for i, env in enumerate(envs):
+                observation, reward, done, info = env.step(actions[i])
+                self.assertEqual((rewards[i], dones[i]), (reward, done))
+                if done:
+                    self.assertEqual(scores[i], info["score"])
+                    finished.append(info["score"])
+                    observation = env.reset()
+                self.assertTrue((observations[i] == observation).all())
+                singles[i] = observation
+        self.assertGreater(max(finished), 5)
+
+    def test_replay_reproduces_game(self):
+        """Test nagrania rozgrywki: format binarny i odtworzenie bez okna oraz z rysowaniem"""
+        game = self.game
+        try:
+            game.start_game(seed=3)  # Trasa, na której skok w 500. kroku kończy grę
+            while game.game_active and game.recorder.frame < 600:
+                pair = next((p for p in game.pipes.pairs() if p.x + p.bottom.width > 100), None)
+                gap_bottom = pair.gap_pos if pair else 400
+                if game.bird.rect.bottom > gap_bottom - 10 and game.bird.movement > 0:
+                    game.jump()
+                if game.recorder.frame == 500:
+                    game.jump()  # Skok w złym momencie kończy grę
+                    game.jump()  # Dwa skoki przed tym samym krokiem to jeden skok
+                game.update()
+            self.assertFalse(game.game_active)
+            replay = game.last_replay
+            self.assertGreater(replay.score, 0)
+            self.assertEqual(replay.seed, game.pipes.spawner.seed)
+            self.assertEqual(len(replay.jumps), len(set(replay.jumps)))
+
+            data = replay.to_bytes()
+            self.assertLess(len(data), len(json.dumps(replay.config)) + 2 * len(replay.jumps) + 40)
+            loaded = Replay.from_bytes(data)
+            self.assertEqual((loaded.seed, loaded.jumps, loaded.frames, loaded.score, loaded.player_name),
+                             (replay.seed, replay.jumps, replay.frames, replay.score, replay.player_name))
+            self.assertEqual(loaded.config['bg_color'], list(game.config['bg_color']))
+            self.assertTrue(loaded.verify())  # Bez okna i bez limitu tempa
+
+            corrupted = bytearray(data)
+            corrupted[-8] ^= 1
+            for bad in (bytes(corrupted), data[:4] + bytes([VERSION + 1]) + data[5:], b"PNG" + data, data[:-1]):
+                with self.assertRaises(ValueError):
+                    Replay.from_bytes(bad)
+
+            # Odtworzenie z rysowaniem (przyspieszone) kończy się tak samo i nie zapisuje wyniku
+            players = game.leaderboard.count
+            self.assertEqual(game.play_replay(loaded, speed=1000), (replay.score, replay.frames))
+            self.assertEqual(game.leaderboard.count, players)
+            self.assertTrue(game.menu_active)
+        finally:
+            game.game_active = False
+            game.menu_active = True
+
     def test_min_score(self):
         min_score = 0
         save_score(self.test_name, min_score)
@@ -134,5 +646,252 @@ class TestFlappyBird(unittest.TestCase):
         with self.assertRaises(ValueError):
             save_score("", 10)
 
+class TestScoreStore(unittest.TestCase):
+    def setUp(self):
+        """Osobny katalog tymczasowy dla plików wyników"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp_dir.name, 'scores.json')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_recovers_from_partial_last_line(self):
+        """Test odzyskiwania danych po przerwanym zapisie ostatniej linii"""
+        store = JsonLogScoreRepository(self.filename)
+        store.add("Ala", 5)
+        store.add("Ola", 7)
+        with open(store._log_path(store.log_generation), 'a') as f:
+            f.write('{"name":"Ela","sc')  # Symulacja awarii w trakcie zapisu
+
+        reopened = JsonLogScoreRepository(self.filename)
+        self.assertEqual([p["name"] for p in reopened.load()["players"]], ["Ala", "Ola"])
+        self.assertEqual(reopened.high_score, 7)
+        reopened.add("Ela", 3)
+        self.assertEqual(len(JsonLogScoreRepository(self.filename).load()["players"]), 3)
+
+    def test_compaction_keeps_all_scores(self):
+        """Test kompaktowania dziennika w tle"""
+        store = JsonLogScoreRepository(self.filename, compact_every=3)
+        for i in range(10):
+            store.add(f"Gracz{i}", i)
+        store.wait_for_compaction(timeout=5)
+
+        reopened = JsonLogScoreRepository(self.filename)
+        self.assertEqual(sorted(p["score"] for p in reopened.load()["players"]), list(range(10)))
+        self.assertEqual(reopened.high_score, 9)
+        self.assertEqual(reopened.search("gracz1"), [{"name": "Gracz1", "score": 1}])
+
+    def test_compactions_run_one_at_a_time(self):
+        """Test naprawy statystyk w trakcie kompaktowania w tle: żaden wpis nie przepada"""
+        store = JsonLogScoreRepository(self.filename)
+        store.add("Ala", 5)
+        write_atomic = store._write_atomic
+        gate = threading.Event()
+
+        def slow_write(path, text):
+            if path == self.filename and threading.current_thread() is background:
+                gate.wait(5)  # Zapis migawki w tle trwa, gdy pojawiają się nowe wpisy
+            write_atomic(path, text)
+
+        with patch.object(store, '_write_atomic', side_effect=slow_write):
+            background = threading.Thread(target=store.compact)
+            background.start()
+            store.add("Ola", 7)
+            store._stats.add("Ola", 7)  # Rozbieżne statystyki do naprawy
+            repair = threading.Thread(target=store.verify_stats, kwargs={"repair": True})
+            repair.start()
+            repair.join(0.2)
+            gate.set()
+            background.join(5)
+            repair.join(5)
+
+        reopened = JsonLogScoreRepository(self.filename)
+        self.assertEqual(sorted(p["name"] for p in reopened.load()["players"]), ["Ala", "Ola"])
+        self.assertTrue(reopened.verify_stats())
+
+    def test_stale_tmp_files_removed_on_load(self):
+        """Test usuwania plików tymczasowych po przerwanym kompaktowaniu"""
+        store = JsonLogScoreRepository(self.filename)
+        store.add("Ala", 5)
+        for path in (self.filename + ".7.log.tmp", self.filename + ".tmp"):
+            with open(path, 'w') as f:
+                f.write('{"format"')
+
+        reopened = JsonLogScoreRepository(self.filename)
+        self.assertEqual(reopened.load()["players"], [{"name": "Ala", "score": 5}])
+        self.assertEqual([name for name in os.listdir(self.tmp_dir.name) if name.endswith(".tmp")], [])
+
+    def test_sqlite_repository_migrates_json(self):
+        """Test migracji wyników z JSON do SQLite i zapytań na indeksach"""
+        json_store = JsonLogScoreRepository(self.filename)
+        json_store.add("Ala", 5)
+        json_store.add("Ola", 9)
+        db = SqliteScoreRepository(os.path.join(self.tmp_dir.name, 'scores.db'),
+                                   migrate_from=self.filename)
+        db.add("ala_kot", 12)
+
+        self.assertEqual(db.load()["high_score"], 12)
+        self.assertEqual([s["name"] for s in db.top(2)], ["ala_kot", "Ola"])
+        self.assertEqual([s["score"] for s in db.search("ALA")], [12, 5])
+        self.assertEqual(db.search("a_k"), [{"name": "ala_kot", "score": 12}])
+        self.assertEqual(db.player_best("ola"), 9)
+        self.assertEqual(db.average(), 8.67)
+        db.close()
+
+    def test_sqlite_interrupted_migration_is_not_duplicated(self):
+        """Test migracji przerwanej po zapisie wyników - wyniki nie są przenoszone dwa razy"""
+        json_store = JsonLogScoreRepository(self.filename)
+        json_store.add("Ala", 5)
+        json_store.add("Ola", 9)
+        db_filename = os.path.join(self.tmp_dir.name, 'scores.db')
+        SqliteScoreRepository(db_filename, migrate_from=None).close()
+        insert = SqliteScoreRepository._insert
+
+        def insert_and_crash(repository, *args):
+            insert(repository, *args)
+            raise RuntimeError("awaria")  # Proces przerwany zaraz po zapisie wyników
+
+        with patch.object(SqliteScoreRepository, '_insert', insert_and_crash):
+            with self.assertRaises(RuntimeError):
+                SqliteScoreRepository(db_filename, migrate_from=self.filename)
+
+        db = SqliteScoreRepository(db_filename, migrate_from=self.filename)
+        self.assertEqual(sorted(p["score"] for p in db.load()["players"]), [5, 9])
+        self.assertEqual(migrate_json_to_sqlite(self.filename, db), 0)
+        db.close()
+
+    def test_sqlite_stats_unchanged_by_failed_insert(self):
+        """Test statystyk SQLite: nieudana transakcja nie zmienia ich w pamięci"""
+        db = SqliteScoreRepository(os.path.join(self.tmp_dir.name, 'scores.db'), migrate_from=None)
+        db.add("Ala", 5)
+        with patch.object(db, '_save_stats', side_effect=RuntimeError("awaria")):
+            with self.assertRaises(RuntimeError):
+                db.add("Ola", 9)
+        self.assertEqual(db.stats().count, 1)
+        self.assertTrue(db.verify_stats())
+        db.close()
+
+    def test_score_writer_drains_queue_on_close(self):
+        """Test zapisu wyników w tle i opróżniania kolejki przy zamknięciu"""
+        store = JsonLogScoreRepository(self.filename)
+        writer = ScoreWriter(store.add_many)
+        for i in range(5):
+            writer.submit("Gracz", i)
+        self.assertTrue(writer.close(timeout=5))
+
+        self.assertEqual(writer.stats()["pending"], 0)
+        self.assertEqual(writer.stats()["flushed"], 5)
+        self.assertEqual(len(JsonLogScoreRepository(self.filename).load()["players"]), 5)
+
+    def test_score_writer_retries_and_counts_dropped(self):
+        """Test zapisu w tle: chwilowy błąd jest ponawiany, a błędny wpis nie blokuje paczki"""
+        store = JsonLogScoreRepository(self.filename)
+        failures = [OSError("dysk zajęty")]
+
+        def flaky_write(entries):
+            if failures:
+                raise failures.pop()
+            store.add_many(entries)
+
+        writer = ScoreWriter(flaky_write, retry_delay=0)
+        writer.submit("Ala", 1)
+        self.assertTrue(writer.close(timeout=5))
+        self.assertEqual((writer.stats()["flushed"], writer.stats()["dropped"]), (1, 0))
+
+        writer = ScoreWriter(store.add_many, retry_delay=0)
+        writer._flush([{"name": "Ola", "score": 2}, {"name": "", "score": 3}, {"name": "Ela", "score": 4}])
+        self.assertEqual((writer.stats()["flushed"], writer.stats()["dropped"]), (2, 1))
+        self.assertEqual(sorted(p["name"] for p in store.load()["players"]), ["Ala", "Ela", "Ola"])
+
+        # save_scores (zapis w grze) przekazuje błędy do ScoreWriter i nic nie wypisuje
+        writer = ScoreWriter(lambda entries: save_scores(entries, self.filename), retry_delay=0)
+        with patch.object(JsonLogScoreRepository, 'add_many', side_effect=OSError("brak miejsca")), \
+                patch('builtins.print') as output:
+            writer._flush([{"name": "Iza", "score": 5}])
+        self.assertEqual((writer.stats()["flushed"], writer.stats()["dropped"]), (0, 1))
+        self.assertFalse(any("wykonano" in str(call) for call in output.call_args_list))
+
+    def test_search_index_matches_file_search(self):
+        """Test zgodności wyszukiwania w indeksie z wyszukiwaniem w magazynie"""
+        store = JsonLogScoreRepository(self.filename)
+        for name, score in [("Ala", 5), ("alan", 8), ("Ola", 3), ("Bartek", 7), ("ala", 9)]:
+            store.add(name, score)
+        index = PlayerSearchIndex(store.load()["players"])
+        index.add("Kala", 1)
+        store.add("Kala", 1)
+
+        for term in ["ala", "A", "LAN", "xyz", "k"]:
+            self.assertEqual(index.search(term), store.search(term))
+        self.assertEqual(index.search("al", limit=2), store.search("al")[:2])
+
+        # Równe wyniki - ta sama kolejność (według nazwy) w indeksie i obu magazynach
+        db = SqliteScoreRepository(os.path.join(self.tmp_dir.name, 'scores.db'), migrate_from=None)
+        for name in ["Zala", "ala", "Ala", "bala"]:
+            index.add(name, 4)
+            store.add(name, 4)
+            db.add(name, 4)
+        expected = [{"name": n, "score": 4} for n in ["Ala", "Zala", "ala", "bala"]]
+        self.assertEqual([s for s in store.search("la") if s["score"] == 4], expected)
+        self.assertEqual(db.search("la"), expected)
+        self.assertEqual(index.search("la"), store.search("la"))
+        self.assertEqual(index.search("la", limit=5), store.search("la")[:5])
+        db.close()
+
+    def test_leaderboard_matches_full_sort(self):
+        """Test rankingu przyrostowego względem pełnego sortowania"""
+        import random
+        rng = random.Random(7)
+        players = [{"name": f"G{rng.randint(0, 30)}", "score": rng.randint(0, 600)} for _ in range(500)]
+        leaderboard = Leaderboard(k=10)
+        for player in players:
+            rank = leaderboard.add(player["name"], player["score"])
+            self.assertEqual(rank, 1 + sum(p["score"] > player["score"] for p in players[:leaderboard.count]))
+
+        expected = sorted(players, key=lambda x: x["score"], reverse=True)[:10]
+        self.assertEqual(leaderboard.top(10), expected)
+        bests = {}
+        for player in players:
+            bests[player["name"]] = max(bests.get(player["name"], 0), player["score"])
+        self.assertEqual([score for _, score in leaderboard.top_players(10)],
+                         sorted(bests.values(), reverse=True)[:10])
+        self.assertEqual(leaderboard.high_score, max(p["score"] for p in players))
+
+    def test_running_stats_persist_and_repair(self):
+        """Test statystyk aktualizowanych przy zapisie, ich odczytu i naprawy"""
+        store = JsonLogScoreRepository(self.filename, compact_every=4)
+        for i, score in enumerate([1, 2, 3, 4, 5, 6, 7, 8, 9, 10]):
+            store.add(f"G{i % 3}", score)
+        store.wait_for_compaction(timeout=5)
+
+        summary = JsonLogScoreRepository(self.filename).stats().summary()
+        self.assertEqual(summary["count"], 10)
+        self.assertEqual(summary["mean"], 5.5)
+        self.assertEqual(summary["stddev"], 2.87)
+        self.assertEqual((summary["p50"], summary["p90"], summary["p99"]), (5, 9, 10))
+        self.assertEqual(store.stats().player_counts, {"G0": 4, "G1": 3, "G2": 3})
+
+        store.stats().total += 100  # Symulacja uszkodzonych statystyk
+        self.assertFalse(store.verify_stats(repair=True))
+        self.assertTrue(JsonLogScoreRepository(self.filename).verify_stats())
+        self.assertEqual(store.average(), 5.5)
+
+    def test_chart_worker_coalesces_requests(self):
+        """Test generowania wykresu w osobnym procesie i ponownego użycia wyniku"""
+        worker = ChartWorker(output=os.path.join(self.tmp_dir.name, 'chart.png'))
+        try:
+            self.assertTrue(worker.request([("Ala", 5), ("Ola", 3)], version=1))
+            self.assertFalse(worker.request([("Ala", 5)], version=1))  # Zlecenie już trwa
+
+            deadline = time.time() + 60
+            while not worker.poll() and time.time() < deadline:
+                time.sleep(0.05)
+            self.assertIsNone(worker.error)
+            self.assertTrue(os.path.exists(worker.output))
+            self.assertFalse(worker.request([("Ala", 5)], version=1))  # Wykres aktualny
+            self.assertFalse(worker.is_current(2))  # Nowe wyniki - wykres do odświeżenia
+        finally:
+            worker.shutdown()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -4,7 +4,7 @@ import random
 import string
 from collections import defaultdict
 from datetime import datetime
-from unittest.mock import MagicMock, patch, PropertyMock
+from unittest.mock import MagicMock, patch
 import gc
 
 # Mockowanie pygame na potrzeby testów pamięci
@@ -13,6 +13,8 @@ pygame_mock.display.set_mode.return_value = MagicMock()
 pygame_mock.font.SysFont.return_value = MagicMock()
 pygame_mock.USEREVENT = 1
 pygame_mock.time.get_ticks.return_value = 1000
+pygame_mock.display.get_surface.return_value.get_width.return_value = 400
+pygame_mock.display.get_surface.return_value.get_height.return_value = 650
 
 
 # Klasa prostokąta do symulowania kolizji
@@ -23,6 +25,14 @@ class MockRect:
         self.width = width
         self.height = height
 
+    @property
+    def left(self):
+        return self.x
+
+    @property
+    def right(self):
+        return self.x + self.width
+
     def colliderect(self, other):
         return False
 
@@ -105,12 +115,9 @@ class MemoryTests:
         for _ in range(self.test_iterations):
             pipes = Pipes(self.config['pipe_width'], self.config['pipe_gap'], self.config['pipe_speed'])
 
-            # Dodaj rzeczywiste rury zamiast mocków
+            # Dodaj rzeczywiste pary rur z trasy
             for _ in range(5):
-                pipe_mock = MagicMock()
-                type(pipe_mock).x = PropertyMock(return_value=random.randint(0, 400))
-                pipe_mock.width = self.config['pipe_width']
-                pipes.pipes.append(pipe_mock)
+                pipes.add_pipe(self.config['height'])
 
             pipes.update()
             pipes.check_collision(MockRect(100, 300, 30, 30))
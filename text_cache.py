@@ -0,0 +1,73 @@
+import pygame
+from collections import OrderedDict
+
+
+class TextCache:
+    """Pamięć podręczna wyrenderowanych napisów (LRU o ograniczonej liczbie wpisów).
+
+    Napis jest renderowany tylko raz dla danej czcionki, treści, wygładzania
+    i koloru - kolejne klatki dostają gotową powierzchnię.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries  # Limit liczby zapamiętanych napisów
+        self._surfaces = OrderedDict()  # Klucz -> powierzchnia (kolejność LRU)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, antialias, color):
+        """Zwraca powierzchnię napisu - jak font.render, ale z pamięci podręcznej."""
+        key = (font, text, antialias, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self._surfaces[key] = font.render(text, antialias, color)
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def hit_rate(self):
+        """Udział trafień w pamięci podręcznej (0..1)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """Czyści pamięć podręczną (np. po zmianie czcionek)."""
+        self._surfaces.clear()
+
+    def stats(self):
+        """Zwraca liczniki trafień, chybień i liczbę wpisów."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._surfaces),
+            "hit_rate": self.hit_rate(),
+        }
+
+
+class DigitAtlas:
+    """Znaki liczby (cyfry) wyrenderowane raz - licznik wyniku składa się z samych blitów."""
+
+    def __init__(self, font, color, antialias=True, chars="0123456789-"):
+        self.glyphs = {char: font.render(char, antialias, color) for char in chars}
+        self.height = font.get_height()
+
+    def width(self, text):
+        """Szerokość napisu złożonego ze znaków atlasu."""
+        return sum(self.glyphs[char].get_width() for char in text)
+
+    def draw(self, screen, text, pos):
+        """Rysuje napis (np. str(wynik)) w punkcie pos. Zwraca zajęty prostokąt."""
+        x, y = pos
+        for char in text:
+            glyph = self.glyphs[char]
+            screen.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return pygame.Rect(pos[0], y, x - pos[0], self.height)
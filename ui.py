@@ -0,0 +1,74 @@
+import pygame
+
+
+class UILayout:
+    """Geometria ekranów menu, opcji i wyników liczona raz dla danej rozdzielczości.
+
+    Te same prostokąty służą do rysowania przycisków i do sprawdzania kliknięć.
+    """
+
+    def __init__(self, width, height, menu_items=4, option_items=6):
+        self.width = width
+        self.height = height
+        center = width // 2
+
+        # Menu główne: przyciski 200x50 co 70 pikseli od y=200
+        self.menu_buttons = [
+            pygame.Rect(center - 100, 200 + i * 70, 200, 50) for i in range(menu_items)
+        ]
+        # Opcje: przyciski 300x40 co 50 pikseli od y=150
+        self.option_buttons = [
+            pygame.Rect(center - 150, 150 + i * 50, 300, 40) for i in range(option_items)
+        ]
+        # Ekran wyników
+        self.search_field = pygame.Rect(center - 150, 120, 300, 30)
+        self.all_button = pygame.Rect(center - 200, 160, 100, 30)
+        self.search_button = pygame.Rect(center + 100, 160, 100, 30)
+        self.results_area = pygame.Rect(center - 150, 200, 300, 320)
+        self.chart_button = pygame.Rect(center - 100, height - 120, 200, 50)
+        self.back_button = pygame.Rect(center - 100, height - 60, 200, 50)
+
+    @staticmethod
+    def hit(rects, pos):
+        """Zwraca indeks prostokąta zawierającego punkt lub None."""
+        for i, rect in enumerate(rects):
+            if rect.collidepoint(pos):
+                return i
+        return None
+
+
+class ButtonSprites:
+    """Przyciski wyrenderowane raz - w stanie zwykłym i wyróżnionym (wybór/kursor).
+
+    Gotowa powierzchnia jest zapamiętywana dla rozmiaru, napisu i stanu,
+    więc narysowanie przycisku w kolejnej klatce to jeden blit.
+    """
+
+    def __init__(self, font, color, highlight_color, text_color, border_color, max_entries=64):
+        self.font = font
+        self.color = color  # Kolor zwykłego przycisku
+        self.highlight_color = highlight_color  # Kolor przycisku wybranego lub wskazanego
+        self.text_color = text_color
+        self.border_color = border_color
+        self.max_entries = max_entries  # Limit zapamiętanych przycisków
+        self._sprites = {}  # (szerokość, wysokość, napis, wyróżniony) -> powierzchnia
+
+    def get(self, size, text, highlighted=False):
+        """Zwraca powierzchnię przycisku o podanym rozmiarze, napisie i stanie."""
+        key = (size[0], size[1], text, highlighted)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            if len(self._sprites) >= self.max_entries:
+                self._sprites.clear()  # Napisy przycisków zmieniają się rzadko
+            sprite = self._sprites[key] = self._render(size, text, highlighted)
+        return sprite
+
+    def _render(self, size, text, highlighted):
+        """Rysuje przycisk na przezroczystej powierzchni."""
+        sprite = pygame.Surface(size, pygame.SRCALPHA)
+        rect = sprite.get_rect()
+        pygame.draw.rect(sprite, self.highlight_color if highlighted else self.color, rect, border_radius=15)
+        pygame.draw.rect(sprite, self.border_color, rect, 2, border_radius=15)
+        label = self.font.render(text, True, self.text_color)
+        sprite.blit(label, label.get_rect(center=rect.center))
+        return sprite
@@ -1,8 +1,8 @@
 import json
 import os
 import time
-from functools import reduce
-import matplotlib.pyplot as plt  # Dodane dla wykresów
+from contextlib import contextmanager
+from score_store import open_score_repository
 
 # Dekorator do pomiaru czasu wykonania funkcji
 def measure_time(func):
@@ -13,19 +13,114 @@ def measure_time(func):
         return result
     return wrapper
 
+class StartupProfiler:
+    """Pomiar czasu kolejnych etapów uruchamiania gry aż do pierwszej klatki."""
+
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.sections = {}  # Nazwa etapu -> łączny czas w sekundach
+        self.first_frame = None  # Czas od startu do pierwszej klatki
+
+    @contextmanager
+    def section(self, name):
+        """Mierzy czas bloku kodu i dolicza go do etapu o podanej nazwie."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        """Dolicza zmierzony czas do etapu."""
+        self.sections[name] = self.sections.get(name, 0.0) + seconds
+
+    def mark_first_frame(self):
+        """Zapamiętuje moment wyświetlenia pierwszej klatki. Zwraca True przy pierwszym wywołaniu."""
+        if self.first_frame is not None:
+            return False
+        self.first_frame = time.perf_counter() - self.start
+        return True
+
+    def report(self, budget_ms=None):
+        """Zwraca raport czasu uruchamiania w postaci tekstu."""
+        lines = ["=== Czas uruchamiania ==="]
+        for name, seconds in self.sections.items():
+            lines.append(f"  {name:<24} {seconds * 1000:8.1f} ms")
+        if self.first_frame is not None:
+            lines.append(f"  {'pierwsza klatka':<24} {self.first_frame * 1000:8.1f} ms")
+        if budget_ms is not None:
+            verdict = "OK" if self.within_budget(budget_ms) else "PRZEKROCZONY"
+            lines.append(f"  {'budżet':<24} {budget_ms:8.1f} ms ({verdict})")
+        return "\n".join(lines)
+
+    def within_budget(self, budget_ms):
+        """Czy pierwsza klatka pojawiła się w zadanym czasie."""
+        return self.first_frame is not None and self.first_frame * 1000 <= budget_ms
+
+
+class FixedTimestep:
+    """Akumulator czasu dla fizyki o stałym kroku, niezależnej od liczby klatek.
+
+    Czas każdej klatki jest dodawany do akumulatora, z którego wykonywane są
+    pełne kroki fizyki. Liczba kroków na klatkę jest ograniczona (max_steps) -
+    po dłuższym przestoju nadmiar czasu jest odrzucany zamiast nadrabiany,
+    żeby gra nie wpadła w spiralę coraz dłuższych klatek.
+    """
+
+    def __init__(self, hz, max_steps=5):
+        self.step_ms = 1000.0 / hz  # Długość kroku fizyki
+        self.max_steps = max_steps
+        self.accumulator = 0.0  # Czas jeszcze nieprzeliczony przez fizykę
+        self.dropped_ms = 0.0  # Łączny czas odrzucony przez limit kroków
+
+    def advance(self, elapsed_ms):
+        """Dodaje czas klatki i zwraca liczbę kroków fizyki do wykonania."""
+        self.accumulator += elapsed_ms
+        steps = min(int(self.accumulator // self.step_ms), self.max_steps)
+        self.accumulator -= steps * self.step_ms
+        if self.accumulator >= self.step_ms:
+            # Limit kroków osiągnięty - zostawiamy tylko ułamek kroku
+            remainder = self.accumulator % self.step_ms
+            self.dropped_ms += self.accumulator - remainder
+            self.accumulator = remainder
+        return steps
+
+    @property
+    def alpha(self):
+        """Położenie między dwoma ostatnimi stanami fizyki (0..1) do interpolacji."""
+        return self.accumulator / self.step_ms
+
+    def reset(self):
+        """Zeruje akumulator (np. przy rozpoczęciu gry)."""
+        self.accumulator = 0.0
+
+
 @measure_time
 def load_config(filename='config.json'):
     """Wczytuje konfigurację gry z pliku JSON. Jeśli plik nie istnieje, używa domyślnych wartości."""
     default_config = {
         'width': 400,
         'height': 600,
+        'window_scale': 1,  # Całkowite powiększenie okna względem ekranu logicznego width x height
         'bg_color': [0, 0, 139],
         'gravity': 0.25,
         'jump_force': 7,
         'pipe_width': 60,
         'pipe_gap': 150,
         'pipe_speed': 3,
-        'fps': 60
+        'pipe_spacing': 270,  # Odległość między kolejnymi parami rur (piksele)
+        'collision_mode': 'rect',  # "rect" (prostokąty) lub "mask" (dokładne, wg pikseli)
+        'fps': 60,  # Limit klatek renderowania (0 - bez limitu)
+        'physics_hz': 60,  # Stała częstotliwość kroków fizyki
+        'max_physics_steps': 5,  # Limit kroków fizyki nadrabianych w jednej klatce
+        'idle_rendering': True,  # Poza rozgrywką rysowanie tylko po zmianie ekranu
+        'render_mode': 'full',  # "full" (cały ekran) lub "dirty" (tylko zmienione obszary)
+        # Warstwy przewijanego tła: [góra, dół] jako ułamki wysokości ekranu i prędkość
+        # jako ułamek pipe_speed; pusta lista - tło stałe
+        'parallax_layers': [[0.0, 0.48, 0.1], [0.48, 0.93, 0.4], [0.93, 1.0, 1.0]],
+        'scores_backend': 'json',  # "json" (scores.json) lub "sqlite" (scores.db)
+        'replay_dir': None,  # Katalog zapisu nagrań rozgrywek (None - bez zapisu)
+        'startup_budget_ms': 2000  # Budżet czasu do pierwszej klatki (--profile-startup)
     }
 
     try:
@@ -48,75 +143,106 @@ def save_config(config, filename='config.json'):
         print(f"Błąd zapisywania konfiguracji: {e}")
         return False
 
-@measure_time
-def save_score(name, score, filename='scores.json'):
-    """Zapisuje wynik gracza do pliku JSON."""
-    try:
-        try:
-            with open(filename, 'r') as f:
-                scores = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            scores = {"players": []}
+# Magazyny wyników współdzielone w obrębie procesu (jeden na plik)
+_score_repositories = {}
+SCORE_FILES = {'json': 'scores.json', 'sqlite': 'scores.db'}
+_default_scores_file = SCORE_FILES['json']
 
-        # Dodanie nowego wyniku
-        scores["players"].append({"name": name, "score": score})
-        # Aktualizacja rekordu
-        scores["high_score"] = max(scores["players"], key=lambda x: x["score"])["score"]
 
-        with open(filename, 'w') as f:
-            json.dump(scores, f, indent=4)
+def configure_scores(config):
+    """Wybiera domyślny magazyn wyników na podstawie klucza 'scores_backend' z konfiguracji."""
+    global _default_scores_file
+    backend = config.get('scores_backend', 'json')
+    if backend not in SCORE_FILES:
+        print(f"Nieznany magazyn wyników: {backend}. Używam 'json'.")
+        backend = 'json'
+    _default_scores_file = SCORE_FILES[backend]
+
+
+def get_score_repository(filename=None):
+    """Zwraca magazyn wyników dla podanego pliku (domyślnie wybranego w konfiguracji)."""
+    filename = filename or _default_scores_file
+    key = os.path.abspath(filename)
+    repository = _score_repositories.get(key)
+    if repository is None:
+        repository = _score_repositories[key] = open_score_repository(filename)
+    return repository
+
+
+@measure_time
+def save_score(name, score, filename=None):
+    """Dopisuje wynik gracza do magazynu wyników."""
+    try:
+        get_score_repository(filename).add(name, score)
     except IOError as e:
         print(f"Błąd zapisywania wyniku: {e}")
 
-def load_scores(filename='scores.json'):
-    """Wczytuje wyniki z pliku JSON."""
+def save_scores(entries, filename=None):
+    """Dopisuje paczkę wyników [{"name": ..., "score": ...}, ...] do magazynu wyników.
+
+    Wywoływana z wątku ScoreWriter, który sam mierzy czas zapisu, ponawia go
+    po błędzie i liczy utracone wyniki - dlatego błędy są przekazywane dalej.
+    """
+    get_score_repository(filename).add_many(entries)
+
+def load_scores(filename=None):
+    """Wczytuje wyniki z magazynu wyników."""
     try:
-        with open(filename, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+        return get_score_repository(filename).load()
+    except IOError:
         return {"players": [], "high_score": 0}  # Domyślne wartości jeśli plik nie istnieje
 
-def get_player_scores(name, filename='scores.json'):
+def get_player_scores(name, filename=None):
     """Pobiera wyniki konkretnego gracza."""
     try:
-        with open(filename, 'r') as f:
-            scores = json.load(f)
-            player_scores = [score for score in scores["players"] if name.lower() in score["name"].lower()]
-            return sorted(player_scores, key=lambda x: x["score"], reverse=True)  # Sortowanie malejąco
-    except (FileNotFoundError, json.JSONDecodeError):
+        return get_score_repository(filename).search(name)  # Sortowanie malejąco
+    except IOError:
         return []
 
-def get_average_score(filename='scores.json'):
-    """Oblicza średni wynik wszystkich graczy."""
+def get_average_score(filename=None):
+    """Zwraca średni wynik wszystkich graczy (z bieżących statystyk, w O(1))."""
     try:
-        with open(filename, 'r') as f:
-            scores = json.load(f)
-            if not scores["players"]:
-                return 0
-            total = reduce(lambda acc, x: acc + x["score"], scores["players"], 0)
-            return round(total / len(scores["players"]), 2)
-    except (FileNotFoundError, json.JSONDecodeError):
+        return get_score_repository(filename).average()
+    except IOError:
         return 0
 
+def get_score_stats(filename=None):
+    """Zwraca liczbę wyników, średnią, odchylenie standardowe, min, max i kwantyle p50/p90/p99."""
+    try:
+        return get_score_repository(filename).stats().summary()
+    except IOError:
+        return {}
+
 
-def plot_scores(filename='scores.json'):
-    """Generuje wykres najlepszych wyników, wyświetla go i zapisuje do pliku."""
+def plot_scores(filename=None, top_players=None, show=True, output="top_scores.png"):
+    """Generuje wykres najlepszych wyników, zapisuje go do pliku i opcjonalnie wyświetla.
+
+    top_players to gotowa lista (nazwa, rekord) np. z Leaderboard.top_players();
+    bez niej rekordy graczy są liczone z pliku wyników. Zwraca True po zapisaniu wykresu.
+    """
     try:
-        scores = load_scores(filename)
-        if not scores["players"]:
-            print("Brak danych do wygenerowania wykresu.")
-            return
+        # Import na żądanie - matplotlib jest potrzebny tylko do wykresu
+        import matplotlib
+        if not show:
+            matplotlib.use('Agg')  # Bez okna - np. w procesie roboczym
+        import matplotlib.pyplot as plt
 
-        # Przygotowanie danych - tylko najlepszy wynik każdego gracza
-        players = {}
-        for player in scores["players"]:
-            name = player["name"]
-            score = player["score"]
-            if name not in players or score > players[name]:
-                players[name] = score
+        if top_players is None:
+            scores = load_scores(filename)
+            # Przygotowanie danych - tylko najlepszy wynik każdego gracza
+            players = {}
+            for player in scores["players"]:
+                name = player["name"]
+                score = player["score"]
+                if name not in players or score > players[name]:
+                    players[name] = score
+            top_players = players.items()
 
         # Sortowanie i wybór top 10
-        sorted_players = sorted(players.items(), key=lambda x: x[1], reverse=True)[:10]
+        sorted_players = sorted(top_players, key=lambda x: x[1], reverse=True)[:10]
+        if not sorted_players:
+            print("Brak danych do wygenerowania wykresu.")
+            return False
         names = [player[0] for player in sorted_players]
         scores = [player[1] for player in sorted_players]
 
@@ -138,11 +264,15 @@ def plot_scores(filename='scores.json'):
         plt.tight_layout()
 
         # Zapisz wykres do pliku
-        plt.savefig("top_scores.png", dpi=100)
-        print("📊 Wykres zapisano jako 'top_scores.png'.")
+        plt.savefig(output, dpi=100)
+        print(f"📊 Wykres zapisano jako '{output}'.")
 
         # Wyświetl wykres
-        plt.show()
+        if show:
+            plt.show()
+        plt.close()
+        return True
 
     except Exception as e:
-        print(f"❌ Błąd podczas generowania wykresu: {e}")
\ No newline at end of file
+        print(f"❌ Błąd podczas generowania wykresu: {e}")
+        return False
\ No newline at end of file